@@ -0,0 +1,326 @@
+import numpy as np
+
+from lines import get_lines
+
+
+# Value of winner of the board where the game is not over
+NO_WINNER = -2
+# Value of winner of the filled board without winner (as in GameField.get_winner)
+DRAW = -1
+
+# Number of positions which are analyzed at once by analyze_positions()
+CHUNK_SIZE = 4096
+
+
+class BatchGameField:
+	"""
+	Represents n_boards fields for playing tic tac toe which are stepped together.
+	Fields are stored in one (n_boards x size x size) integer matrix, where 0 is
+	an empty cell and (index + 1) is a cell of player with index index.
+	Players are identified by their indices (0, 1, 2, ...), the same as default
+	players of GameField.
+	"""
+
+	def __init__(self, n_boards, size=3, n_players=2, win_length=None):
+		"""
+		Initialization of basics parameters.
+		:param n_boards: number of fields.
+		:param size: size of each game field.
+		:param n_players: number of players.
+		:param win_length: number of cells in the winning line (size by default).
+		"""
+		# Basic parameters
+		self.n_boards = n_boards
+		self.size = size
+		self.n_players = n_players
+		self.win_length = win_length or size
+
+		# Parameters validation
+		if not self.n_players > 1:
+			raise ValueError(
+				f"Number of players (n_players) must be greater than 1. "\
+				f"Wrong: {self.n_players} > 1."
+			)
+
+		if not self.n_players < self.size:
+			raise ValueError(
+				f"Number of players (n_players) must be less than size of field (size)! "\
+				f"n_players: {self.n_players}, size: {self.size}. "\
+				f"Wrong: {self.n_players} < {self.size}."
+			)
+
+		if not 1 < self.win_length <= self.size:
+			raise ValueError(
+				f"Length of winning line (win_length) must be greater than 1 and not greater "\
+				f"than size of field (size)! win_length: {self.win_length}, size: {self.size}. "\
+				f"Wrong: 1 < {self.win_length} <= {self.size}."
+			)
+
+		# Cells of winning lines and lines of each cell padded with index of the extra line
+		self.lines, self.cell_lines = get_line_arrays(self.size, self.win_length)
+
+		# Creating empty fields
+		self.boards = np.zeros((self.n_boards, self.size, self.size), dtype=np.int8)
+
+		# Index of current player of each field
+		self.current_players = np.zeros(self.n_boards, dtype=np.int64)
+		# Winner of each field
+		self.winners = np.full(self.n_boards, NO_WINNER, dtype=np.int64)
+		# Number of filled cells of each field
+		self.n_filled = np.zeros(self.n_boards, dtype=np.int64)
+
+	@property
+	def active(self):
+		"""Returns the mask of fields where the game is not over."""
+		return self.winners == NO_WINNER
+
+	def step(self, rows, columns):
+		"""
+		Sets the values of current players to cells (rows[i], columns[i]) of each field i
+		where the game is not over. Moves of other fields are ignored.
+		:param rows: array of n_boards row indices.
+		:param columns: array of n_boards column indices.
+		:return array of winners (player index, DRAW or NO_WINNER).
+		"""
+		rows = np.asarray(rows)
+		columns = np.asarray(columns)
+
+		# Indices of fields where the game is not over
+		indices = np.flatnonzero(self.active)
+		rows = rows[indices]
+		columns = columns[indices]
+
+		if (self.boards[indices, rows, columns] != 0).any():
+			raise ValueError("Some of the cells are not empty.")
+
+		# Selecting the cells
+		values = (self.current_players[indices] + 1).astype(np.int8)
+		self.boards[indices, rows, columns] = values
+		self.n_filled[indices] += 1
+
+		# Searching winners in lines which contain the cells
+		boards = self.boards.reshape(self.n_boards, -1)
+		cell_lines = self.cell_lines[rows * self.size + columns]
+		won = (
+			(boards[indices[:, None, None], self.lines[cell_lines]] == values[:, None, None]).all(axis=2)
+			& (cell_lines < len(self.lines) - 1)
+		).any(axis=1)
+
+		# Fields filled
+		filled = self.n_filled[indices] == self.size * self.size
+
+		self.winners[indices[won]] = self.current_players[indices[won]]
+		self.winners[indices[filled & ~won]] = DRAW
+
+		# Getting next players
+		moved = indices[~won & ~filled]
+		self.current_players[moved] = (self.current_players[moved] + 1) % self.n_players
+
+		return self.winners
+
+	def get_winners(self):
+		"""
+		Searches winners in all winning lines of all fields.
+		:return array of winners (player index, DRAW or NO_WINNER).
+		"""
+		return find_winners(self.boards, self.n_players, self.win_length)
+
+	def random_moves(self, rng):
+		"""
+		Chooses a random empty cell in each field.
+		:param rng: numpy random generator.
+		:return tuple (rows, columns); cells of filled fields are arbitrary.
+		"""
+		# Random weight for each empty cell, -1 for filled cells
+		weights = rng.random((self.n_boards, self.size * self.size))
+		weights[self.boards.reshape(self.n_boards, -1) != 0] = -1
+
+		cells = weights.argmax(axis=1)
+		return cells // self.size, cells % self.size
+
+	def play_random_games(self, seed=None):
+		"""
+		Plays random games in all fields until the game is over in each of them.
+		:return array of winners (player index or DRAW).
+		"""
+		rng = np.random.default_rng(seed)
+
+		if self.n_filled.any():
+			# Random order of the empty cells of each field
+			empty = self.boards.reshape(self.n_boards, -1) == 0
+			weights = np.where(empty, rng.random(empty.shape), -1)
+			order = np.argsort(-weights, axis=1)
+
+			n_step = 0
+			while self.active.any():
+				cells = order[:, n_step]
+				self.step(cells // self.size, cells % self.size)
+				n_step += 1
+
+			return self.winners
+
+		# All fields are empty, so the whole games are played at once.
+		# Number of the step when each cell is selected
+		n_cells = self.size * self.size
+		times = rng.random((self.n_boards, n_cells)).argsort(axis=1).argsort(axis=1)
+		# Index of the player who selects each cell
+		players = times % self.n_players
+
+		# Winning lines of each field
+		lines = self.lines[:-1]
+		line_players = players.reshape(self.n_boards, -1)[:, lines]
+		line_times = times.reshape(self.n_boards, -1)[:, lines]
+
+		# The line is won when its last cell is selected if all its cells belong to one player
+		uniform = (line_players == line_players[:, :, :1]).all(axis=2)
+		won_times = np.where(uniform, line_times.max(axis=2), n_cells).min(axis=1)
+		won = won_times < n_cells
+
+		# Number of the last step of each game
+		last_steps = np.where(won, won_times, n_cells - 1)
+
+		self.boards[:] = np.where(
+			times <= last_steps[:, None], players + 1, 0
+		).reshape(self.boards.shape)
+		self.n_filled[:] = last_steps + 1
+		self.current_players[:] = last_steps % self.n_players
+		self.winners[:] = np.where(won, last_steps % self.n_players, DRAW)
+
+		return self.winners
+
+
+def get_line_arrays(size, win_length=None):
+	"""
+	Returns winning lines of the field as arrays.
+	:return tuple (lines, cell_lines), where lines is (n_lines + 1 x win_length) array
+	of cells of each line and cell_lines is (size * size x max_lines) array of indices
+	of lines which contain each cell. The last line is used for padding of cell_lines,
+	it is not a winning line.
+	"""
+	lines, cell_lines = get_lines(size, win_length)
+	line_array = np.array(lines + [[0] * len(lines[0])], dtype=np.int64)
+
+	max_lines = max(len(indices) for indices in cell_lines)
+	cell_array = np.full((size * size, max_lines), len(lines), dtype=np.int64)
+	for cell, indices in enumerate(cell_lines):
+		cell_array[cell, :len(indices)] = indices
+
+	return line_array, cell_array
+
+
+def find_winners(boards, n_players, win_length=None):
+	"""
+	Searches winners in all winning lines of each field.
+	:param boards: (n_boards x size x size) integer matrix, 0 is an empty cell and
+	(index + 1) is a cell of player with index index.
+	:param n_players: number of players.
+	:param win_length: number of cells in the winning line (size by default).
+	:return array of winners (player index, DRAW or NO_WINNER).
+	"""
+	n_boards, size, _ = boards.shape
+	lines, _ = get_line_arrays(size, win_length)
+
+	# Cells of every line of each field
+	cells = boards.reshape(n_boards, -1)[:, lines[:-1]]
+	winners = np.full(n_boards, NO_WINNER, dtype=np.int64)
+
+	for index in range(n_players - 1, -1, -1):
+		won = (cells == index + 1).all(axis=2).any(axis=1)
+		winners[won] = index
+
+	# Fields filled
+	filled = (boards != 0).all(axis=(1, 2))
+	winners[filled & (winners == NO_WINNER)] = DRAW
+
+	return winners
+
+
+def analyze_positions(boards, n_players=2, win_length=None, chunk_size=CHUNK_SIZE):
+	"""
+	Analyzes positions by parts of chunk_size positions, so memory does not grow
+	with number of positions. Players do steps in order of their indices, so the
+	player to move is (number of filled cells) % n_players.
+	:param boards: (n_boards x size x size) integer matrix, 0 is an empty cell and
+	(index + 1) is a cell of player with index index.
+	:param n_players: number of players.
+	:param win_length: number of cells in the winning line (size by default).
+	:param chunk_size: number of positions analyzed at once.
+	:return tuple (winners, legal, moves), where winners is array of winners (player
+	index, DRAW or NO_WINNER), legal is (n_boards x size x size) boolean matrix of
+	cells where the player to move can do a step and moves is (n_boards x 2) array
+	of (row, column) of steps chosen by choose_moves() or (-1, -1) if the game is over.
+	"""
+	boards = np.asarray(boards)
+
+	if boards.ndim != 3 or boards.shape[1] != boards.shape[2]:
+		raise ValueError(
+			f"Positions (boards) must be (n_boards x size x size) matrix. "\
+			f"Wrong: {boards.shape}."
+		)
+
+	n_boards, size, _ = boards.shape
+	winners = np.empty(n_boards, dtype=np.int64)
+	legal = np.empty(boards.shape, dtype=bool)
+	moves = np.empty((n_boards, 2), dtype=np.int64)
+
+	for start in range(0, n_boards, chunk_size):
+		chunk = boards[start:start + chunk_size]
+		end = start + len(chunk)
+
+		winners[start:end] = find_winners(chunk, n_players, win_length)
+		legal[start:end] = (chunk == 0) & (winners[start:end] == NO_WINNER)[:, None, None]
+
+		cells = choose_moves(chunk, n_players, win_length)
+		cells[winners[start:end] != NO_WINNER] = -1
+		moves[start:end, 0] = np.where(cells >= 0, cells // size, -1)
+		moves[start:end, 1] = np.where(cells >= 0, cells % size, -1)
+
+	return winners, legal, moves
+
+
+def choose_moves(boards, n_players=2, win_length=None):
+	"""
+	Chooses a step of the player to move in each field by one vectorized pass over
+	all winning lines. Each line gets a value for its empty cells: a line with only
+	cells of the player to move is an attack, a line with only cells of one of the
+	other players is a defence. Values grow with number of cells in the line, and
+	one line of the next level (attack of c cells, then defence of c + 1 cells, then
+	attack of c + 1 cells) is more valuable than all lines of lower levels through
+	the cell. So the step wins if it can, else blocks a winning line of an opponent.
+	:param boards: (n_boards x size x size) integer matrix as in find_winners().
+	:return array of cells (row * size + column), -1 for filled fields.
+	"""
+	n_boards, size, _ = boards.shape
+	win_length = win_length or size
+	lines, cell_lines = get_line_arrays(size, win_length)
+
+	flat_boards = boards.reshape(n_boards, -1)
+	# Index of the player to move in each field
+	movers = (flat_boards != 0).sum(axis=1) % n_players
+
+	# Number of cells of each player in every line of each field
+	cells = flat_boards[:, lines[:-1]]
+	counts = np.stack([(cells == index + 1).sum(axis=2) for index in range(n_players)], axis=1)
+	totals = counts.sum(axis=1)
+	own = counts[np.arange(n_boards), movers]
+
+	# Values of levels of lines, there are not more than 4 * win_length lines through a cell
+	base = 4.0 * win_length + 1
+	attack_values = base ** (2 * np.arange(win_length + 1) + 1)
+	defence_values = base ** (2 * np.arange(win_length + 1))
+
+	single_owner = (counts == totals[:, None, :]).any(axis=1)
+	line_values = np.where(
+		own == totals, attack_values[own],
+		np.where(single_owner & (own == 0), defence_values[totals], 0.0)
+	)
+
+	# Sum of values of lines through each cell, the padding line has zero value
+	line_values = np.concatenate([line_values, np.zeros((n_boards, 1))], axis=1)
+	cell_values = line_values[:, cell_lines].sum(axis=2)
+	cell_values[flat_boards != 0] = -1
+
+	moves = cell_values.argmax(axis=1)
+	moves[(flat_boards != 0).all(axis=1)] = -1
+
+	return moves
@@ -0,0 +1,55 @@
+"""
+Compares BatchGameField with playing GameField games one by one and
+analyze_positions() with checking positions by GameField one by one.
+Run: python -m benchmarks.batch
+"""
+import time
+
+import numpy as np
+
+from game import GameField
+from batch import BatchGameField, analyze_positions
+from benchmarks.bitboard import play_random_games
+
+
+def main():
+	print(f"{'engine':<16}{'size':>6}{'games':>10}{'games/sec':>14}")
+
+	for size in (3, 5, 10):
+		n_games = max(20, 20000 // (size * size))
+		start = time.perf_counter()
+		play_random_games(GameField, size, 2, n_games)
+		elapsed = time.perf_counter() - start
+		print(f"{'GameField':<16}{size:>6}{n_games:>10}{n_games / elapsed:>14.0f}")
+
+		n_boards = 100000 // size
+		start = time.perf_counter()
+		BatchGameField(n_boards, size=size).play_random_games(seed=0)
+		elapsed = time.perf_counter() - start
+		print(f"{'BatchGameField':<16}{size:>6}{n_boards:>10}{n_boards / elapsed:>14.0f}")
+
+	print()
+	print(f"{'analysis':<16}{'size':>6}{'positions':>10}{'positions/sec':>14}")
+
+	rng = np.random.default_rng(0)
+	for size in (3, 15, 19):
+		win_length = min(size, 5)
+		boards = rng.integers(0, 3, (20000, size, size), dtype=np.int8)
+
+		n_positions = 500
+		start = time.perf_counter()
+		for board in boards[:n_positions]:
+			field = GameField(size=size, win_length=win_length)
+			field.field[:] = np.where(board == 0, None, board - 1)
+			field.get_winner()
+		elapsed = time.perf_counter() - start
+		print(f"{'GameField':<16}{size:>6}{n_positions:>10}{n_positions / elapsed:>14.0f}")
+
+		start = time.perf_counter()
+		analyze_positions(boards, win_length=win_length)
+		elapsed = time.perf_counter() - start
+		print(f"{'batch':<16}{size:>6}{len(boards):>10}{len(boards) / elapsed:>14.0f}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,66 @@
+"""
+Compares BitboardGameField with GameField (ndarray of None).
+Run: python -m benchmarks.bitboard
+"""
+import random
+import time
+import tracemalloc
+
+from game import GameField
+from bitboard import BitboardGameField
+
+
+def play_random_games(field_class, size, n_players, n_games, seed=0):
+	"""Plays n_games random games and returns number of steps."""
+	rng = random.Random(seed)
+	players = list(range(n_players))
+	cells = [(row, column) for row in range(size) for column in range(size)]
+	n_steps = 0
+
+	for _ in range(n_games):
+		field = field_class(size=size, n_players=n_players, player_list=players)
+		rng.shuffle(cells)
+
+		for row, column in cells:
+			n_steps += 1
+			if field.step(row, column) is not None:
+				break
+
+	return n_steps
+
+
+def measure_memory(field_class, size, n_players, n_fields=100):
+	"""Returns number of bytes allocated for one field."""
+	players = list(range(n_players))
+
+	tracemalloc.start()
+	fields = [
+		field_class(size=size, n_players=n_players, player_list=players)
+		for _ in range(n_fields)
+	]
+	size_in_bytes, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	del fields
+	return size_in_bytes // n_fields
+
+
+def main():
+	print(f"{'class':<20}{'size':>6}{'steps/sec':>14}{'games/sec':>12}{'bytes/field':>14}")
+
+	for size in (3, 5, 10, 20):
+		n_games = max(20, 20000 // (size * size))
+
+		for field_class in (GameField, BitboardGameField):
+			start = time.perf_counter()
+			n_steps = play_random_games(field_class, size, 2, n_games)
+			elapsed = time.perf_counter() - start
+
+			print(
+				f"{field_class.__name__:<20}{size:>6}{n_steps / elapsed:>14.0f}"
+				f"{n_games / elapsed:>12.0f}{measure_memory(field_class, size, 2):>14}"
+			)
+
+
+if __name__ == '__main__':
+	main()
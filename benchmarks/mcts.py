@@ -0,0 +1,29 @@
+"""
+Measures speed of MCTSPlayer with different numbers of workers.
+Run: python -m benchmarks.mcts
+"""
+import os
+
+from game import GameField
+from mcts import MCTSPlayer
+
+
+def main(size=10, time_limit=2.0):
+	print(f"{'workers':>8}{'playouts':>12}{'playouts/sec':>16}")
+
+	n_workers = 1
+	while n_workers <= (os.cpu_count() or 1):
+		field = GameField(size=size, n_players=2, player_list=['X', 'O'])
+		bot = MCTSPlayer(field, time_limit=time_limit, n_workers=n_workers, seed=0)
+
+		# The first step creates the process pool, so it is not measured
+		bot.step()
+		bot.step()
+		bot.close()
+
+		print(f"{n_workers:>8}{bot.n_playouts:>12}{bot.playouts_per_second:>16.0f}")
+		n_workers *= 2
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,205 @@
+"""
+Load generator for the game server: plays random games over many connections
+and prints percentiles of step latency (from sending the step to receiving it
+back from the server) and sustained number of steps per second.
+Each connection takes all seats of its games, finished games are replaced by new ones.
+Run: python -m benchmarks.server --games 10000 --connections 100 --duration 30
+(without --port the server is started in a child process)
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+
+from server import GameServer
+
+
+class LoadClient:
+	"""Represents one connection of the load generator with its games."""
+
+	def __init__(self, reader, writer, n_games, settings, deadline, rng):
+		"""
+		Initialization of basics parameters.
+		:param n_games: number of concurrent games of the connection.
+		:param settings: dict with size, n_players and win_length of the games.
+		:param deadline: time (time.perf_counter()) when new games are not created.
+		"""
+		self.reader = reader
+		self.writer = writer
+		self.n_games = n_games
+		self.settings = settings
+		self.deadline = deadline
+		self.rng = rng
+
+		# Empty cells of each game
+		self.free_cells = dict()
+		# Time of sending of the step of each game
+		self.sent = dict()
+
+		# Unsent messages
+		self.output = list()
+
+		self.latencies = list()
+		self.n_finished = 0
+		self.n_active = 0
+
+	def send(self, message):
+		"""Puts the message to the output, it is sent after handling of received messages."""
+		self.output.append(json.dumps(message, separators=(',', ':')).encode())
+
+	async def flush(self):
+		"""Writes all unsent messages to the socket at once."""
+		self.output.append(b'')
+		self.writer.write(b'\n'.join(self.output))
+		self.output.clear()
+		await self.writer.drain()
+
+	def create_game(self):
+		"""Creates a new game."""
+		self.n_active += 1
+		self.send({'type': 'create', **self.settings})
+
+	def send_step(self, game_id):
+		"""Sends a random step of the game."""
+		free_cells = self.free_cells[game_id]
+		position = self.rng.randrange(len(free_cells))
+		free_cells[position], free_cells[-1] = free_cells[-1], free_cells[position]
+		row, column = divmod(free_cells[-1], self.settings['size'])
+
+		self.sent[game_id] = time.perf_counter()
+		self.send({'type': 'step', 'game': game_id, 'row': row, 'column': column})
+
+	async def run(self):
+		"""Plays the games until the deadline and waits for the last games to finish."""
+		for _ in range(self.n_games):
+			self.create_game()
+		await self.flush()
+
+		rest = b''
+
+		while self.n_active:
+			data = await self.reader.read(1 << 16)
+			if not data:
+				raise ConnectionError("The server closed the connection.")
+
+			*lines, rest = (rest + data).split(b'\n')
+			for line in lines:
+				self.handle_message(json.loads(line))
+
+			await self.flush()
+
+		self.writer.close()
+
+	def handle_message(self, message):
+		"""Handles the message of the server."""
+		kind = message['type']
+
+		if kind == 'created':
+			for _ in range(self.settings['n_players'] - 1):
+				self.send({'type': 'join', 'game': message['game']})
+		elif kind == 'start':
+			game_id = message['game']
+			self.free_cells[game_id] = list(range(self.settings['size'] ** 2))
+			self.send_step(game_id)
+		elif kind == 'step':
+			game_id = message['game']
+			self.latencies.append(time.perf_counter() - self.sent.pop(game_id))
+			self.free_cells[game_id].pop()
+
+			if message['winner'] is None:
+				self.send_step(game_id)
+			else:
+				del self.free_cells[game_id]
+				self.n_finished += 1
+				self.n_active -= 1
+
+				if time.perf_counter() < self.deadline:
+					self.create_game()
+		elif kind == 'error':
+			raise ValueError(f"Error of the server: {message['message']}")
+
+
+async def run_load(host, port, n_games, n_connections, duration, settings, seed=0):
+	"""
+	Plays games on the server.
+	:return tuple (list of step latencies in seconds, number of finished games, elapsed time)
+	"""
+	start = time.perf_counter()
+	deadline = start + duration
+
+	clients = list()
+	for number in range(n_connections):
+		reader, writer = await asyncio.open_connection(host, port)
+		n_client_games = n_games // n_connections + (number < n_games % n_connections)
+		clients.append(LoadClient(
+			reader, writer, n_client_games, settings, deadline, random.Random(seed + number)
+		))
+
+	await asyncio.gather(*(client.run() for client in clients))
+	elapsed = time.perf_counter() - start
+
+	latencies = [latency for client in clients for latency in client.latencies]
+	n_finished = sum(client.n_finished for client in clients)
+
+	return latencies, n_finished, elapsed
+
+
+def run_server(host, port, ready):
+	"""Runs the server in the child process."""
+	async def serve():
+		started = asyncio.Event()
+		task = asyncio.create_task(GameServer().serve(host, port, started))
+		await started.wait()
+		ready.set()
+		await task
+
+	asyncio.run(serve())
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Load generator for the game server.')
+	parser.add_argument('--host', default='127.0.0.1', help='address of the server')
+	parser.add_argument('--port', type=int, help='port of the running server')
+	parser.add_argument('--games', type=int, default=10000, help='number of concurrent games')
+	parser.add_argument('--connections', type=int, default=100, help='number of connections')
+	parser.add_argument('--duration', type=float, default=10.0, help='time of the test in seconds')
+	parser.add_argument('--size', type=int, default=3, help='size of game field')
+	parser.add_argument('--n-players', type=int, default=2, help='number of players in a game')
+	parser.add_argument(
+		'--win-length', type=int, help='number of cells in the winning line (size by default)'
+	)
+	args = parser.parse_args()
+
+	server = None
+	port = args.port
+	if port is None:
+		port = 8765
+		ready = multiprocessing.Event()
+		server = multiprocessing.Process(
+			target=run_server, args=(args.host, port, ready), daemon=True
+		)
+		server.start()
+		ready.wait()
+
+	settings = {'size': args.size, 'n_players': args.n_players, 'win_length': args.win_length}
+
+	try:
+		latencies, n_finished, elapsed = asyncio.run(run_load(
+			args.host, port, args.games, args.connections, args.duration, settings
+		))
+	finally:
+		if server is not None:
+			server.terminate()
+
+	latencies.sort()
+	print(f"games: {n_finished}, steps: {len(latencies)}, time: {elapsed:.1f} s")
+	print(f"steps/sec: {len(latencies) / elapsed:.0f}")
+	for percentile in (50, 99):
+		value = latencies[min(len(latencies) - 1, len(latencies) * percentile // 100)]
+		print(f"p{percentile} latency: {value * 1e3:.2f} ms")
+
+
+if __name__ == '__main__':
+	main()
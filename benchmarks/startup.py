@@ -0,0 +1,51 @@
+"""
+Measures the time of importing the game logic without GUI and with GUI.
+Run: python -m benchmarks.startup
+"""
+import os
+import subprocess
+import sys
+import time
+
+
+# Root directory of the project
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Measured imports
+IMPORTS = {
+	'python': 'pass',
+	'engine': 'import game',
+	'gui': 'import gui',
+	'menu': 'import menu',
+}
+
+
+def measure(code, n_runs=5):
+	"""Returns the least time of running python with code in seconds or None if it failed."""
+	times = list()
+
+	for _ in range(n_runs):
+		start = time.perf_counter()
+		process = subprocess.run(
+			[sys.executable, '-c', code], cwd=ROOT, capture_output=True
+		)
+		times.append(time.perf_counter() - start)
+
+		if process.returncode != 0:
+			return None
+
+	return min(times)
+
+
+def main():
+	print(f"{'path':<10}{'time, ms':>10}")
+
+	for name, code in IMPORTS.items():
+		elapsed = measure(code)
+		# Menu creates the window, so it fails without display
+		result = f'{elapsed * 1000:.1f}' if elapsed is not None else 'failed'
+		print(f"{name:<10}{result:>10}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,316 @@
+"""
+Benchmarks of the engine and AI hot paths.
+Run: python -m benchmarks.suite --output results.json [--baseline baseline.json] [--quick]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from evaluation import PatternEvaluator
+from game import GameField, AIPlayer
+from pool import FieldPool
+from search import SearchEngine
+
+
+# Sizes of the field and maximal number of players
+SIZES = (3, 5, 10, 20, 30, 50)
+QUICK_SIZES = (3, 5, 10)
+MAX_PLAYERS = 5
+# Large fields and length of winning line for benchmarks of evaluation
+EVALUATION_SIZES = (15, 19)
+EVALUATION_WIN_LENGTH = 5
+
+# Relative change of the metric which is reported as regression
+THRESHOLD = 0.1
+
+
+def get_player_counts(size):
+	"""Returns numbers of players which are tested on the field of the given size."""
+	return range(2, min(size - 1, MAX_PLAYERS) + 1)
+
+
+def play_random_game(size, n_players, rng, pool=None):
+	"""
+	Plays one random game.
+	:param pool: FieldPool which gives the field or None to create a new field.
+	:return tuple (number of steps, time of steps in seconds)
+	"""
+	if pool is None:
+		field = GameField(size=size, n_players=n_players, player_list=list(range(n_players)))
+	else:
+		field, _ = pool.acquire(size=size, n_players=n_players)
+	cells = [(row, column) for row in range(size) for column in range(size)]
+	rng.shuffle(cells)
+
+	start = time.perf_counter()
+	for row, column in cells:
+		if field.step(row, column) is not None:
+			break
+	elapsed = time.perf_counter() - start
+	n_steps = len(field.history)
+
+	if pool is not None:
+		pool.release(field)
+
+	return n_steps, elapsed
+
+
+def bench_step_latency(results, sizes, min_steps):
+	"""Measures mean time of GameField.step()."""
+	rng = random.Random(0)
+
+	for size in sizes:
+		for n_players in get_player_counts(size):
+			n_steps = 0
+			elapsed = 0.0
+
+			while n_steps < min_steps:
+				game_steps, game_time = play_random_game(size, n_players, rng)
+				n_steps += game_steps
+				elapsed += game_time
+
+			results[f'step_latency/size={size}/players={n_players}'] = {
+				'value': elapsed / n_steps * 1e6, 'unit': 'us', 'better': 'lower',
+			}
+
+
+def bench_game_throughput(results, sizes, min_time):
+	"""
+	Measures number of random games per second including creation of the field
+	and with fields reused by FieldPool.
+	"""
+	rng = random.Random(0)
+
+	for size in sizes:
+		for name, pool in (('game_throughput', None), ('game_throughput_pooled', FieldPool())):
+			n_games = 0
+			start = time.perf_counter()
+
+			while time.perf_counter() - start < min_time:
+				play_random_game(size, 2, rng, pool)
+				n_games += 1
+
+			results[f'{name}/size={size}'] = {
+				'value': n_games / (time.perf_counter() - start), 'unit': 'games/s',
+				'better': 'higher',
+			}
+
+
+def bench_ai_latency(results, sizes, n_positions):
+	"""Measures percentiles of time of AIPlayer.step() in random positions."""
+	rng = random.Random(0)
+
+	for size in sizes:
+		times = list()
+
+		for _ in range(n_positions):
+			field = GameField(size=size, n_players=2, player_list=['X', 'O'])
+			bot = AIPlayer(field)
+
+			# Random opening of random length
+			for _ in range(rng.randrange(size * size // 2)):
+				if field.step(*field.get_random_free_cell(rng)) is not None:
+					break
+
+			if field.winner is not None:
+				continue
+
+			start = time.perf_counter()
+			bot.step()
+			times.append(time.perf_counter() - start)
+
+		times.sort()
+		for percentile in (50, 90, 99):
+			value = times[min(len(times) - 1, len(times) * percentile // 100)]
+			results[f'ai_latency/size={size}/p{percentile}'] = {
+				'value': value * 1e3, 'unit': 'ms', 'better': 'lower',
+			}
+
+
+def bench_evaluation(results, sizes, n_games, n_positions):
+	"""
+	Measures time of the evaluation by scanning of all lines and by the incremental
+	evaluator during random games and speed of the search which uses the evaluator.
+	"""
+	rng = random.Random(0)
+
+	for size in sizes:
+		engine = SearchEngine(size, win_length=EVALUATION_WIN_LENGTH, max_depth=2)
+		evaluator = PatternEvaluator(size, 2, EVALUATION_WIN_LENGTH)
+		scan_time = 0.0
+		incremental_time = 0.0
+		n_steps = 0
+
+		for _ in range(n_games):
+			cells = list(range(size * size))
+			rng.shuffle(cells)
+			masks = [0, 0]
+			evaluator.reset()
+
+			for number, cell in enumerate(cells[:size * size // 2]):
+				index = number % 2
+				masks[index] |= 1 << cell
+
+				start = time.perf_counter()
+				engine.evaluate(masks[1 - index], masks[index])
+				scan_time += time.perf_counter() - start
+
+				start = time.perf_counter()
+				evaluator.add(cell, index)
+				evaluator.evaluate(1 - index)
+				incremental_time += time.perf_counter() - start
+
+				n_steps += 1
+
+		results[f'evaluation/size={size}/scan'] = {
+			'value': scan_time / n_steps * 1e6, 'unit': 'us', 'better': 'lower',
+		}
+		results[f'evaluation/size={size}/incremental'] = {
+			'value': incremental_time / n_steps * 1e6, 'unit': 'us', 'better': 'lower',
+		}
+
+		# Searched positions per second in random middlegame positions
+		n_nodes = 0
+		start = time.perf_counter()
+		for _ in range(n_positions):
+			cells = rng.sample(range(size * size), size)
+			own = sum(1 << cell for cell in cells[::2])
+			other = sum(1 << cell for cell in cells[1::2])
+			engine.table.clear()
+			engine.search(own, other)
+			n_nodes += engine.nodes
+
+		results[f'search_speed/size={size}'] = {
+			'value': n_nodes / (time.perf_counter() - start), 'unit': 'nodes/s', 'better': 'higher',
+		}
+
+
+def bench_ai_deadline(results, sizes, time_limits, n_positions):
+	"""
+	Measures the maximal time of AIPlayer.step() with the time limit on large fields,
+	where the search cannot be finished in time, and the reached depth.
+	"""
+	rng = random.Random(0)
+
+	for size in sizes:
+		for time_limit in time_limits:
+			times = list()
+			depths = list()
+
+			for _ in range(n_positions):
+				field = GameField(size=size, n_players=2, win_length=EVALUATION_WIN_LENGTH)
+				bot = AIPlayer(field, max_depth=size * size)
+
+				for _ in range(rng.randrange(size, size * 2)):
+					field.step(*field.get_random_free_cell(rng))
+
+				start = time.perf_counter()
+				bot.step(time_limit=time_limit)
+				times.append(time.perf_counter() - start)
+				depths.append(bot.engine.depth)
+
+			name = f'ai_deadline/size={size}/limit={time_limit * 1e3:.0f}ms'
+			results[f'{name}/max'] = {
+				'value': max(times) * 1e3, 'unit': 'ms', 'better': 'lower',
+			}
+			results[f'{name}/depth'] = {
+				'value': sum(depths) / len(depths), 'unit': 'plies', 'better': 'higher',
+			}
+
+
+def bench_memory(results, sizes):
+	"""Measures peak memory of one field during a random game."""
+	rng = random.Random(0)
+
+	for size in sizes:
+		tracemalloc.start()
+		play_random_game(size, 2, rng)
+		_, peak = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+
+		results[f'memory_peak/size={size}'] = {
+			'value': peak / 1024, 'unit': 'KiB', 'better': 'lower',
+		}
+
+
+def run(quick=False):
+	"""Runs all benchmarks and returns dict of results."""
+	sizes = QUICK_SIZES if quick else SIZES
+	results = dict()
+
+	bench_step_latency(results, sizes, min_steps=2000 if quick else 20000)
+	bench_game_throughput(results, sizes, min_time=0.2 if quick else 1.0)
+	bench_ai_latency(results, (3, 4, 5), n_positions=20 if quick else 100)
+	bench_evaluation(
+		results, EVALUATION_SIZES, n_games=2 if quick else 10, n_positions=2 if quick else 10
+	)
+	bench_ai_deadline(
+		results, EVALUATION_SIZES, (0.05, 0.2), n_positions=5 if quick else 20
+	)
+	bench_memory(results, sizes)
+
+	return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+	"""
+	Prints changes of metrics relative to the baseline.
+	:return number of regressions
+	"""
+	n_regressions = 0
+	print(f"{'metric':<40}{'baseline':>12}{'current':>12}{'change':>10}")
+
+	for name, result in results.items():
+		if name not in baseline:
+			continue
+
+		old = baseline[name]['value']
+		new = result['value']
+		change = (new - old) / old if old else 0.0
+
+		# Positive change is always worse
+		if result['better'] == 'higher':
+			change = -change
+
+		mark = ''
+		if change > threshold:
+			mark = ' REGRESSION'
+			n_regressions += 1
+
+		print(f"{name:<40}{old:>12.2f}{new:>12.2f}{change:>+10.1%}{mark}")
+
+	return n_regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Benchmarks of tic tac toe engine and AI.')
+	parser.add_argument('--output', help='JSON file for results')
+	parser.add_argument('--baseline', help='JSON file with results to compare with')
+	parser.add_argument('--quick', action='store_true', help='run on small fields only')
+	parser.add_argument(
+		'--threshold', type=float, default=THRESHOLD, help='relative change reported as regression'
+	)
+	args = parser.parse_args()
+
+	results = run(quick=args.quick)
+
+	if args.output:
+		with open(args.output, 'w') as file:
+			json.dump(results, file, indent=2)
+
+	if args.baseline:
+		with open(args.baseline) as file:
+			baseline = json.load(file)
+
+		if compare(results, baseline, args.threshold):
+			sys.exit(1)
+	else:
+		for name, result in results.items():
+			print(f"{name:<40}{result['value']:>12.2f} {result['unit']}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,120 @@
+import numpy as np
+
+from game import GameField
+from lines import get_line_masks
+from zobrist import get_canonical_hash
+
+
+class BitboardGameField(GameField):
+	"""
+	Represents a field for playing tic tac toe which stores cells of each player
+	in one integer bitmask. Bit (row * size + column) of the mask is set if the cell
+	(row, column) belongs to the player.
+	"""
+
+	def create_field(self):
+		"""Creates empty masks of the players."""
+		# Masks of cells of each player
+		self.masks = [0] * self.n_players
+		# Mask of filled cells
+		self.filled = 0
+		# Mask of the whole field
+		self.full_mask = (1 << (self.size * self.size)) - 1
+
+		# Masks of lines
+		self.line_masks, self.cell_line_masks = get_line_masks(self.size, self.win_length)
+
+	def clear_field(self):
+		"""Clears masks of the players."""
+		self.masks[:] = [0] * self.n_players
+		self.filled = 0
+
+	@property
+	def field(self):
+		"""
+		Returns a read-only snapshot of the field: (size x size) matrix with symbols of
+		the players and None in empty cells. The matrix is built from masks on each
+		access in O(size * size), use is_free() or masks to read single cells.
+		"""
+		field = np.full(self.size * self.size, None)
+
+		for player, mask in zip(self.players, self.masks):
+			while mask:
+				bit = mask & -mask
+				field[bit.bit_length() - 1] = player
+				mask ^= bit
+
+		# Changes of the snapshot would not change the masks
+		field.flags.writeable = False
+		return field.reshape((self.size, self.size))
+
+	def set_cell(self, row, column, index):
+		"""
+		Sets the value of player with index index to empty cell (row, column).
+		:return number of winner or None
+		"""
+		cell = row * self.size + column
+		bit = 1 << cell
+
+		# Selecting the cell
+		mask = self.masks[index] | bit
+		self.masks[index] = mask
+		self.filled |= bit
+
+		# Searching winner in lines which contain the cell
+		for line in self.cell_line_masks[cell]:
+			if mask & line == line:
+				return self.players[index]
+
+		# Field filled
+		if self.filled == self.full_mask:
+			return -1
+
+		# There is no winner
+		return None
+
+	def clear_cell(self, row, column, index):
+		"""Clears cell (row, column) of player with index index."""
+		bit = 1 << (row * self.size + column)
+		self.masks[index] ^= bit
+		self.filled ^= bit
+
+	def get_winner(self):
+		"""Searches a winner in rows, columns and diagonals."""
+		for player, mask in zip(self.players, self.masks):
+			for line in self.line_masks:
+				if mask & line == line:
+					return player
+
+		# Field filled
+		if self.filled == self.full_mask:
+			return -1
+
+		# There is no winner
+		return None
+
+	def get_canonical_hash(self):
+		"""Returns the hash of the position which is the same for all 8 symmetric positions."""
+		cells = [
+			(cell, index)
+			for index, mask in enumerate(self.masks)
+			for cell in range(self.size * self.size) if mask >> cell & 1
+		]
+
+		return get_canonical_hash(
+			self.size, self.n_players, cells, self.player_indices[self.current_player]
+		)
+
+	def copy(self):
+		"""
+		Returns a copy of the field in O(n_players): masks are copied, lists of free
+		cells and steps are shared until one of the fields changes (copy on write).
+		"""
+		field = object.__new__(BitboardGameField)
+		field.__dict__.update(self.__dict__)
+		field.masks = self.masks.copy()
+
+		self.shared_lists = True
+		field.shared_lists = True
+
+		return field
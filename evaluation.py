@@ -0,0 +1,117 @@
+from lines import get_lines
+
+
+class PatternEvaluator:
+	"""
+	Represents a heuristic evaluation of the position by segments of the players.
+	Each winning line (window of win_length cells) which contains cells of only one
+	player is his segment and gives him line_values[number of his cells]. Segments
+	with cells of several players are blocked and give nothing. So an open row of
+	cells is counted in several windows and a row blocked at one end in less windows.
+	Tables of segments are updated by each set or cleared cell, therefore the
+	evaluation takes O(n_players) instead of scanning all lines of the field.
+	"""
+
+	def __init__(self, size, n_players=2, win_length=None, base=10):
+		"""
+		Initialization of basics parameters.
+		:param size: size of game field.
+		:param n_players: number of players.
+		:param win_length: number of cells in the winning line (size by default).
+		:param base: segment with one more cell is base times more valuable.
+		"""
+		self.size = size
+		self.n_players = n_players
+		self.win_length = win_length or size
+
+		self.lines, self.cell_lines = get_lines(size, self.win_length)
+
+		# Value of the segment with n cells of one player
+		self.line_values = [0] + [base ** count for count in range(self.win_length)]
+
+		self.reset()
+
+	def reset(self):
+		"""Clears all cells."""
+		# Number of cells of each player and of all players in every line
+		self.line_counts = [[0] * len(self.lines) for _ in range(self.n_players)]
+		self.line_totals = [0] * len(self.lines)
+
+		# Sum of values of segments of each player
+		self.scores = [0] * self.n_players
+
+	def copy(self):
+		"""Returns a copy of the evaluator."""
+		evaluator = object.__new__(PatternEvaluator)
+		evaluator.__dict__.update(self.__dict__)
+		evaluator.line_counts = [line_counts.copy() for line_counts in self.line_counts]
+		evaluator.line_totals = self.line_totals.copy()
+		evaluator.scores = self.scores.copy()
+
+		return evaluator
+
+	def get_owner(self, line, total):
+		"""Returns index of the player who has all total cells of the line or None."""
+		for index, line_counts in enumerate(self.line_counts):
+			if line_counts[line] == total:
+				return index
+
+		return None
+
+	def add(self, cell, index):
+		"""
+		Sets cell (row * size + column) of player with index index.
+		:param cell: empty cell.
+		"""
+		line_counts = self.line_counts[index]
+		line_totals = self.line_totals
+		line_values = self.line_values
+		scores = self.scores
+
+		for line in self.cell_lines[cell]:
+			count = line_counts[line]
+			total = line_totals[line]
+
+			if count == total:
+				# The segment of the player grows
+				scores[index] += line_values[count + 1] - line_values[count]
+			elif count == 0:
+				# The segment of the other player is blocked now
+				owner = self.get_owner(line, total)
+				if owner is not None:
+					scores[owner] -= line_values[total]
+
+			line_counts[line] = count + 1
+			line_totals[line] = total + 1
+
+	def remove(self, cell, index):
+		"""
+		Clears cell (row * size + column) of player with index index.
+		:param cell: cell of the player set by add().
+		"""
+		line_counts = self.line_counts[index]
+		line_totals = self.line_totals
+		line_values = self.line_values
+		scores = self.scores
+
+		for line in self.cell_lines[cell]:
+			count = line_counts[line] - 1
+			total = line_totals[line] - 1
+			line_counts[line] = count
+			line_totals[line] = total
+
+			if count == total:
+				# The segment of the player shrinks
+				scores[index] -= line_values[count + 1] - line_values[count]
+			elif count == 0:
+				# The segment of the other player is not blocked anymore
+				owner = self.get_owner(line, total)
+				if owner is not None:
+					scores[owner] += line_values[total]
+
+	def evaluate(self, index):
+		"""
+		Returns the heuristic value of the position for player with index index:
+		his segments minus segments of all other players.
+		"""
+		return self.scores[index] * 2 - sum(self.scores)
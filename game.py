@@ -1,21 +1,33 @@
 import random
 import numpy as np
-import tkinter as tk
+
+from lines import get_lines
+from maxn import MaxnEngine
+from search import SearchEngine
+from value import ValueFunction
+from zobrist import get_zobrist_keys, get_canonical_hash
+
+
+# Maximal number of searched positions per step of AIPlayer by default, if the field
+# is larger than solve_cells and there is no time limit (about 0.5 s on 15 x 15 field)
+DEFAULT_MAX_NODES = 20000
 
 
 class GameField:
 	"""Represents a field for playing tic tac toe."""
 
-	def __init__(self, size=3, n_players=2, player_list=None):
+	def __init__(self, size=3, n_players=2, player_list=None, win_length=None):
 		"""
 		Initialization of basics parameters.
 		:param size: size of game field.
 		:param n_players: number of players.
 		:param player_list: list of players symbols.
+		:param win_length: number of cells in the winning line (size by default).
 		"""
 		# Basic parameters
 		self.size = size
 		self.n_players = n_players
+		self.win_length = win_length or size
 
 		if player_list:
 			self.players = player_list
@@ -36,395 +48,455 @@ class GameField:
 				f"Wrong: {self.n_players} < {self.size}."
 			)
 
-		if not self.n_players == len(player_list):
+		if not self.n_players == len(self.players):
 			raise ValueError(
 				f"Number of players (n_players) must be equal to length of player_list! "\
-				f"n_players: {self.n_players}, length of player_list: {len(player_list)}. "\
-				f"Wrong: {self.n_players} == {len(player_list)}."
+				f"n_players: {self.n_players}, length of player_list: {len(self.players)}. "\
+				f"Wrong: {self.n_players} == {len(self.players)}."
 			)
 
+		if not 1 < self.win_length <= self.size:
+			raise ValueError(
+				f"Length of winning line (win_length) must be greater than 1 and not greater "\
+				f"than size of field (size)! win_length: {self.win_length}, size: {self.size}. "\
+				f"Wrong: 1 < {self.win_length} <= {self.size}."
+			)
+
+		# Winning lines of the field
+		self.lines, self.cell_lines = get_lines(self.size, self.win_length)
+
+		# Index of each player in the list of players
+		self.player_indices = {player: index for index, player in enumerate(self.players)}
+
+		# Keys of Zobrist hashing
+		self.cell_keys, self.side_keys = get_zobrist_keys(self.size, self.n_players)
+
+		# Creating an empty field
+		self.create_field()
+
+		# Empty cells (row * size + column) in arbitrary order and position of each
+		# cell in this list (-1 for filled cells)
+		self.free_cells = list(range(self.size * self.size))
+		self.free_positions = list(range(self.size * self.size))
+
+		# Index of current player
+		self.current_index = 0
+		# Getting a  current player
+		self.current_player = self.players[self.current_index]
+
+		# Winner of the game or None
+		self.winner = None
+
+		# Zobrist hash of the position, it is updated by each step
+		self.hash = self.side_keys[0]
+
+		# Done and undone steps (row, column)
+		self.history = list()
+		self.redo_steps = list()
+		# Lists of free cells and steps are shared with a copy of the field until it changes
+		self.shared_lists = False
+
+	def create_field(self):
+		"""Creates an empty field and line counters."""
 		# Creating an empty (self.size x self.size) matrix
 		self.field = np.full((self.size, self.size), None)
 
-		# Creating an iterator by player list
-		self.player_list = self.players_chain(self.n_players, player_list)
-		
-		# Getting a  current player
-		self.current_player = next(self.player_list)
+		# Number of cells of each player in every winning line
+		self.line_counts = [[0] * len(self.lines) for _ in range(self.n_players)]
+		# Counters of an empty field, they are copied by clear_field()
+		self.empty_line_counts = [0] * len(self.lines)
+
+		# Number of filled cells
+		self.n_filled = 0
+
+	def clear_field(self):
+		"""Clears all cells and line counters in place."""
+		self.field.fill(None)
+
+		for line_counts in self.line_counts:
+			line_counts[:] = self.empty_line_counts
+
+		self.n_filled = 0
+
+	def is_free(self, row, column):
+		"""Returns True if cell (row, column) is empty."""
+		return self.free_positions[row * self.size + column] >= 0
+
+	def get_free_cells(self):
+		"""Returns the list of empty cells (row, column)."""
+		return [divmod(cell, self.size) for cell in self.free_cells]
+
+	def get_random_free_cell(self, rng=random):
+		"""
+		Returns random empty cell (row, column).
+		:param rng: random generator with method choice().
+		"""
+		return divmod(rng.choice(self.free_cells), self.size)
 
 	def step(self, row, column):
 		"""
 		If cell (row, column) is empty then sets the value of current player to it.
 		:return number of winner or None
 		"""
-		if self.field[row][column] is None:
-			# Selecting the cell
-			self.field[row][column] = self.current_player
+		if self.winner is not None:
+			raise ValueError("The game is over.")
 
-			# Getting the winner
-			winner = self.get_winner()
-			if winner is not None:
-				# Returning the winner
-				return winner
+		if not self.is_free(row, column):
+			raise ValueError(f"Cell ({row}, {column}) is not empty.")
 
-			# Getting a next player
-			self.current_player = next(self.player_list)
+		if self.shared_lists:
+			self.unshare_lists()
 
-			# There is no winner
-			return None 
+		# New step makes undone steps unavailable
+		self.redo_steps.clear()
 
-		else:
-			raise ValueError(f"Cell ({row}, {column}) is not empty.")
+		return self.make_step(row, column)
 
-	def get_winner(self):
-		"""Searches a winner in rows, columns and diagonals."""
-		for index in range(self.size):
-			# Searching winner in row[index]
-			player = self.field[index, 0]
-			if player is not None and (self.field[index] == player).all():
-				return player
+	def make_step(self, row, column):
+		"""
+		Sets the value of current player to empty cell (row, column) and saves the step
+		to the history.
+		:return number of winner or None
+		"""
+		if self.shared_lists:
+			self.unshare_lists()
 
-			# Searching winner in column[index]
-			player = self.field[0, index]
-			if player is not None and (self.field[:, index] == player).all():
-				return player
+		index = self.current_index
 
-		# Searching winner in diagonal from left-top to right-bottom
-		player = self.field[0, 0]
-		if player is not None and (self.field.diagonal() == player).all():
-			return player
+		# Selecting the cell and getting the winner
+		winner = self.set_cell(row, column, index)
 
-		# Searching winner in diagonal from right-top to left-bottom
-		player = self.field[0, -1]
-		if player is not None and (np.fliplr(self.field).diagonal() == player).all():
-			return player
+		# Updating the hash and the empty cells by the selected cell
+		cell = row * self.size + column
+		self.hash ^= self.cell_keys[index][cell]
 
-		# Field filled
-		if None not in self.field:
-			return -1
+		# Moving the last empty cell to the place of the selected one
+		position = self.free_positions[cell]
+		last_cell = self.free_cells.pop()
+		if last_cell != cell:
+			self.free_cells[position] = last_cell
+			self.free_positions[last_cell] = position
+		self.free_positions[cell] = -1
+
+		self.history.append((row, column))
+		self.winner = winner
+
+		if winner is not None:
+			# Returning the winner
+			return winner
+
+		# Getting a next player
+		self.current_index = (index + 1) % self.n_players
+		self.current_player = self.players[self.current_index]
+		self.hash ^= self.side_keys[index] ^ self.side_keys[self.current_index]
 
 		# There is no winner
 		return None
 
-	@staticmethod
-	def players_chain(n_players, player_list):
-		"""Returns number of next player."""
-		while True:
-			for player in player_list:
-				yield player
+	def undo(self):
+		"""
+		Cancels the last step.
+		:return (row, column) of the cancelled step
+		"""
+		if not self.history:
+			raise ValueError("There are no steps to undo.")
 
+		if self.shared_lists:
+			self.unshare_lists()
 
-class AIPlayer:
-	"""Represents a bot with AI for tic tac toe game."""
+		row, column = self.history.pop()
+
+		# The player did not change if the step finished the game
+		if self.winner is None:
+			index = (self.current_index - 1) % self.n_players
+			self.hash ^= self.side_keys[self.current_index] ^ self.side_keys[index]
+			self.current_index = index
+			self.current_player = self.players[index]
+
+		# Clearing the cell
+		cell = row * self.size + column
+		self.clear_cell(row, column, self.current_index)
+		self.hash ^= self.cell_keys[self.current_index][cell]
+
+		self.free_positions[cell] = len(self.free_cells)
+		self.free_cells.append(cell)
+
+		self.winner = None
+		self.redo_steps.append((row, column))
 
-	def __init__(self, field):
+		return row, column
+
+	def redo(self):
 		"""
-		Initialization of basics parameters.
-		:param field: object of GameField class.
+		Repeats the last cancelled step.
+		:return number of winner or None
 		"""
-		self.field = field
+		if not self.redo_steps:
+			raise ValueError("There are no steps to redo.")
 
-	def step(self):
-		"""Search position for next step."""
-		# Symbol of player
-		symbol_1 = self.field.players[0]
-		# Symbol of bot
-		symbol_2 = self.field.players[1]
-
-		# Indices of free cells
-		free_cells = list()
-
-		for index in range(self.field.size):
-			# Getting row and column
-			row = self.field.field[index]
-			column = self.field.field[:, index]
-
-			if None in row:
-				# Index of None
-				none_index = np.where(row == None)[0][0]
-				# If one symbol repeat in the row, then...
-				if sum(row == symbol_2) == 2 or sum(row == symbol_1) == 2:
-					# Return coords of None
-					return index, none_index
-				else:
-					# Or add None coords to free_cells
-					free_cells.append((index, none_index))
-
-			if None in column:
-				# Index of None
-				none_index = np.where(column == None)[0][0]
-				# If one symbol repeat in the column, then...
-				if sum(column == symbol_2) == 2 or sum(column == symbol_1) == 2:
-					# Return coords of None
-					return none_index, index
-				else:
-					# Or add None coords to free_cells
-					free_cells.append((none_index, index))
-
-		# From left-top to right-bottom diagonal
-		diag_1 = self.field.field.diagonal()
-		# From right-top to left-bottom diagonal
-		diag_2 = np.fliplr(self.field.field).diagonal()
-
-		if None in diag_1:
-			# Index of None
-			none_index = np.where(diag_1 == None)[0][0]
-			# If one symbol repeat in the diagonal, then...
-			if sum(diag_1 == symbol_2) == 2 or sum(diag_1 == symbol_1) == 2:
-				# Return coords of None
-				return none_index, none_index
-			else:
-				# Or add None coords to free_cells
-				free_cells.append((none_index, none_index))
-
-		if None in diag_2:
-			# Index of None
-			none_index = np.where(diag_2 == None)[0][0]
-			# If one symbol repeat in the diagonal, then...
-			if sum(diag_2 == symbol_2) == 2 or sum(diag_2 == symbol_1) == 2:
-				# Return coords of None
-				return none_index, self.field.size - none_index - 1
-			else:
-				# Or add None coords to free_cells
-				free_cells.append((index, self.field.size - none_index - 1))
-
-		# Getting random coord from list of best coords
-		free_cell = random.choice(free_cells)
-		# And returns it!
-		return free_cell[0], free_cell[1]
-
-
-class TicTacToeGame:
-	"""Represents a game process in tic tac toe game."""
+		if self.shared_lists:
+			self.unshare_lists()
 
-	def __init__(
-			self, n_players, field_size, window, menu_frame=None, using_ai=False, cell_size=100
-		):
+		row, column = self.redo_steps.pop()
+		return self.make_step(row, column)
+
+	def unshare_lists(self):
+		"""Copies the lists shared with a copy of the field before changing them."""
+		self.free_cells = self.free_cells.copy()
+		self.free_positions = self.free_positions.copy()
+		self.history = self.history.copy()
+		self.redo_steps = self.redo_steps.copy()
+		self.shared_lists = False
+
+	def reset(self):
 		"""
-		Initialing of basics parameters of playing in tic tac toe.
-		:param n_players: number of players.
-		:param field_size: size of the game field, number of cells in one row.
-		:param window: Tkinter window tk.Tk().
-		:param menu_frame: Menu frame.
-		:param using_ai: if n_players is 2 then second player can be bot with AI.
-		:param cell_size: size of one cell.
+		Clears the field in place for a new game, so the field and its lists are
+		reused instead of creating a new field. The field is the same as a new one.
 		"""
-		# tkinter objects
-		self.window = window
-		self.menu_frame = menu_frame
+		if self.shared_lists:
+			self.unshare_lists()
 
-		# Settings of the players
-		self.n_players = n_players
-		self.using_ai = using_ai
-
-		# Sizes
-		self.cell_size = cell_size
-		self.field_size = field_size
-		self.figure_size = self.cell_size // 2
-		self.line_width = self.cell_size // 10
-		self.canvas_size = self.field_size * self.cell_size + (self.field_size-1) * self.line_width
-
-		# Colors
-		self.line_color = '#000'
-
-		# Figure and line coords
-		self.figures = list()
-		self.line_coords = [
-			(self.cell_size + self.line_width) * coord - self.line_width // 2
-			for coord in range(1, self.field_size)
-		]
+		self.clear_field()
 
-		# Symbols of the players in the game
-		if self.n_players == 2:
-			# Classic symbols of tic tac toe game
-			self.player_list = ['X', 'O']
-		else:
-			# Numbers (0, 1, 2, ...)
-			self.player_list = list(range(self.n_players))
+		self.free_cells[:] = range(self.size * self.size)
+		self.free_positions[:] = self.free_cells
 
-		# Game field
-		self.game_field = GameField(
-			size=self.field_size, n_players=self.n_players, player_list=self.player_list
-		)
+		self.current_index = 0
+		self.current_player = self.players[0]
+		self.winner = None
+		self.hash = self.side_keys[0]
 
-		# AI player
-		if self.n_players == 2 and self.field_size == 3 and self.using_ai:
-			self.bot = AIPlayer(field=self.game_field)
+		self.history.clear()
+		self.redo_steps.clear()
 
-		# Creating widgets
-		# tkinter variables
-		self.var_game_state = tk.StringVar(self.window, '')
+	def set_cell(self, row, column, index):
+		"""
+		Sets the value of player with index index to empty cell (row, column).
+		:return number of winner or None
+		"""
+		self.field[row, column] = self.players[index]
+		return self.check_step(row, column)
 
-		# tkinter widgets
-		# Main frame which contains all widgets
-		self.main_frame = tk.Frame(self.window)
+	def clear_cell(self, row, column, index):
+		"""Clears cell (row, column) of player with index index and its line counters."""
+		self.field[row, column] = None
 
-		# Contains the state of the game
-		self.game_state_lbl = tk.Label(
-			self.main_frame, textvariable=self.var_game_state, font='Raleway 20'
-		)
-		self.game_state_lbl.pack(pady=10, ipadx=10)
+		line_counts = self.line_counts[index]
+		for line in self.cell_lines[row * self.size + column]:
+			line_counts[line] -= 1
 
-		# Frame with buttons
-		self.buttons_frame = tk.Frame(self.main_frame)
+		self.n_filled -= 1
 
-		self.button_close = tk.Button(
-			self.buttons_frame, text='Закончить игру', font='Arial 10', command=self.close_the_game
-		)
-		self.button_restart = tk.Button(
-			self.buttons_frame, text='Играть заново', font='Arial 10', command=self.restart_the_game
-		)
-		self.button_close.grid(row=0, column=0, padx=(0, 3))
-		self.button_restart.grid(row=0, column=1, padx=(3, 0))
+	def check_step(self, row, column):
+		"""
+		Updates the line counters by step of current player to cell (row, column)
+		and searches a winner only in lines which contain this cell.
+		:return number of winner, -1 if field filled or None
+		"""
+		# Counters of the current player
+		line_counts = self.line_counts[self.current_index]
+		won = False
+
+		for line in self.cell_lines[row * self.size + column]:
+			line_counts[line] += 1
+			# Line is won if all its cells belong to the current player
+			if line_counts[line] == self.win_length:
+				won = True
+
+		self.n_filled += 1
+
+		if won:
+			return self.current_player
+
+		# Field filled
+		if self.n_filled == self.size * self.size:
+			return -1
+
+		# There is no winner
+		return None
+
+	def get_winner(self):
+		"""
+		Searches a winner in all winning lines of the whole field.
+		It is slower than check_step() and is used to cross-check it.
+		"""
+		field = self.field.ravel()
+
+		for line in self.lines:
+			player = field[line[0]]
+			if player is not None and (field[line] == player).all():
+				return player
+
+		# Field filled
+		if None not in field:
+			return -1
+
+		# There is no winner
+		return None
+
+	def get_canonical_hash(self):
+		"""Returns the hash of the position which is the same for all 8 symmetric positions."""
+		cells = [
+			(cell, self.player_indices[player])
+			for cell, player in enumerate(self.field.flat) if player is not None
+		]
 
-		# Canvas with the game field
-		self.canvas = tk.Canvas(
-			self.main_frame, width=self.canvas_size, height=self.canvas_size, bg='#fff'
+		return get_canonical_hash(
+			self.size, self.n_players, cells, self.player_indices[self.current_player]
 		)
-		self.canvas.pack()
 
-		# Binding the clicks by field to self.field_click function
-		self.canvas.bind('<Button-1>', self.field_click)
 
-		# Drawing the game grid
-		for coord in self.line_coords:
-			self.canvas.create_line(
-				0, coord, self.canvas_size + 1, coord, width=self.line_width, fill=self.line_color
+class AIPlayer:
+	"""Represents a bot with AI for tic tac toe game."""
+
+	def __init__(
+			self, field, max_depth=4, solve_cells=9, max_nodes=None, time_limit=None,
+			book=None, min_book_games=10, tablebase=None, paranoid=False, value_function=None
+		):
+		"""
+		Initialization of basics parameters.
+		:param field: object of GameField class.
+		:param max_depth: maximal depth of the search.
+		:param solve_cells: positions with this or less number of empty cells are searched
+		to the end of the game.
+		:param max_nodes: maximal number of searched positions per step or None. If it is
+		None, time_limit is None and the field has more than solve_cells cells, then
+		it is DEFAULT_MAX_NODES.
+		:param time_limit: maximal time of search per step in seconds or None.
+		:param book: object of PositionBook class used as opening book or None.
+		:param min_book_games: minimal number of games of the step to take it from the book.
+		:param tablebase: object of Tablebase class with perfect steps or None.
+		:param paranoid: if True then with more than 2 players the bot expects that
+		all opponents play against him, otherwise each player plays for himself (max^n).
+		With more than 2 players max_depth is limited by 3 and max_nodes is 5000 by default.
+		:param value_function: object of ValueFunction class or path to its weights or None.
+		If it is suitable for the field, the bot does the step with the best value without search.
+		"""
+		self.field = field
+		self.book = book
+		self.min_book_games = min_book_games
+		self.tablebase = tablebase
+
+		if isinstance(value_function, str):
+			value_function = ValueFunction.load(value_function)
+		self.value_function = value_function
+
+		if field.n_players == 2:
+			# Without any budget the search of a large field takes minutes
+			if max_nodes is None and time_limit is None and field.size ** 2 > solve_cells:
+				max_nodes = DEFAULT_MAX_NODES
+
+			self.engine = SearchEngine(
+				field.size, win_length=field.win_length, max_depth=max_depth,
+				solve_cells=solve_cells, max_nodes=max_nodes, time_limit=time_limit
 			)
-			self.canvas.create_line(
-				coord, 0, coord, self.canvas_size + 1, width=self.line_width, fill=self.line_color
+		else:
+			self.engine = MaxnEngine(
+				field.size, field.n_players, win_length=field.win_length,
+				max_depth=min(max_depth, 3), max_nodes=max_nodes or 5000,
+				time_limit=time_limit, paranoid=paranoid
 			)
 
-	def start_the_game(self):
-		"""Start the game!"""
-		# Shows fram with the game
-		self.main_frame.pack()
-		# Updating info about the game
-		self.show_game_state(winner=None)
-
-	def close_the_game(self):
-		"""Close the game."""
-		# Closes frame with the game
-		self.main_frame.pack_forget()
-
-		# If main menu frame exist then...
-		if self.menu_frame is not None:
-			# Show the main menu
-			self.menu_frame.pack(ipadx=10, ipady=10)
+	def step(self, time_limit=None, stop_event=None):
+		"""
+		Search position for next step.
+		:param time_limit: maximal time of the search in seconds or None for time_limit
+		of the bot, the search returns the best step found in this time.
+		:param stop_event: threading.Event which stops the search when it is set or None.
+		Unlike stop(), it may be set before the search starts.
+		"""
+		# Looking for the perfect step in the tablebase
+		if self.tablebase is not None and self.tablebase.is_suitable(self.field):
+			result = self.tablebase.get_best_step(self.field)
+			if result is not None and result[0] is not None:
+				return result[0]
+
+		# Looking for the step in the opening book
+		if self.book is not None:
+			book_step = self.get_book_step()
+			if book_step is not None:
+				return book_step
+
+		# Evaluating all steps by the learned value function
+		if self.value_function is not None and self.value_function.is_suitable(self.field):
+			return self.value_function.get_best_step(self.field)
+
+		# Index of bot in the list of players
+		index = self.field.current_index
+		masks = self.get_masks()
+
+		if self.field.n_players == 2:
+			# Masks of cells of bot and of his opponent
+			cell, _ = self.engine.search(
+				masks[index], masks[1 - index], index, self.field.hash,
+				time_limit=time_limit, stop_event=stop_event
+			)
 		else:
-			# Close the window
-			self.window.destroy()
+			cell, _ = self.engine.search(masks, index, time_limit=time_limit, stop_event=stop_event)
 
-	def restart_the_game(self):
-		"""Restarts the game."""
-		# Hide the buttons frame
-		self.buttons_frame.pack_forget()
+		return divmod(cell, self.field.size)
 
-		# Recreating the game field
-		self.game_field = GameField(
-			size=self.field_size, n_players=self.n_players, player_list=self.player_list
-		)
+	def reset(self, seed=None):
+		"""
+		Prepares the bot for a new game on its field instead of creating a new bot.
+		The transposition table is cleared, so steps do not depend on previous games.
+		:param seed: not used, bots with random steps take a new seed.
+		"""
+		# The max^n search has no transposition table
+		if isinstance(self.engine, SearchEngine):
+			self.engine.table.clear()
 
-		# Recreating the AI player
-		if self.n_players == 2 and self.field_size == 3 and self.using_ai:
-			self.bot = AIPlayer(field=self.game_field)
+	def get_book_step(self):
+		"""Returns the step with the best score in the opening book or None."""
+		best_step = None
+		best_score = -1
 
-		# Recreating the canvas with the game field
-		self.canvas.pack_forget()
-		self.canvas = tk.Canvas(
-			self.main_frame, width=self.canvas_size, height=self.canvas_size, bg='#fff'
-		)
-		self.canvas.pack()
+		for row, column, wins, draws, losses in self.book.lookup(self.field):
+			n_games = wins + draws + losses
+			if n_games < self.min_book_games:
+				continue
 
-		# Drawing the game grid
-		for coord in self.line_coords:
-			self.canvas.create_line(
-				0, coord, self.canvas_size + 1, coord, width=self.line_width, fill=self.line_color
-			)
-			self.canvas.create_line(
-				coord, 0, coord, self.canvas_size + 1, width=self.line_width, fill=self.line_color
-			)
+			score = (wins + draws / 2) / n_games
+			if score > best_score:
+				best_score = score
+				best_step = (row, column)
 
-		# Binding the clicks by field to self.field_click function
-		self.canvas.bind('<Button-1>', self.field_click)
+		return best_step
 
-		# Updating info about the game
-		self.show_game_state(winner=None)
+	def stop(self):
+		"""Stops the current search, it may be called from another thread."""
+		self.engine.stop()
 
-	def show_game_state(self, winner=None):
-		"""Shows the info of the game or the winner if there is one."""
-		# Checking the state of the game
-		if winner is not None:
-			# Game over
-			self.canvas.unbind('<Button-1>')
-			self.buttons_frame.pack(after=self.game_state_lbl, pady=(0, 10))
+	def get_masks(self):
+		"""Returns bitmasks of cells of each player."""
+		# The field stores masks itself
+		if hasattr(self.field, 'masks'):
+			return self.field.masks
 
-			if winner == -1:
-				# Dead heat
-				self.var_game_state.set('Ничья!')
-			else:
-				# We have a winner
-				self.var_game_state.set(f'Выиграл игрок: {winner}!')
+		masks = [0] * self.field.n_players
+		for cell, player in enumerate(self.field.field.flat):
+			if player is not None:
+				masks[self.field.player_indices[player]] |= 1 << cell
 
-		else:
-			# Updates the text of current player
-			self.var_game_state.set(f'Сейчас xодит игрок: {self.game_field.current_player}')
-
-	def bot_step(self):
-		"""Does the bot step."""
-		ai_row, ai_column = self.bot.step()
-		# Drawing bot figure
-		self.draw_figure(ai_row, ai_column)
-		# Does the game step and gets the winner if there is one
-		winner = self.game_field.step(ai_row, ai_column)
-		# Player may do his step again
-		self.canvas.bind('<Button-1>', self.field_click)
-		# Updates info about the game
-		self.show_game_state(winner=winner)
-
-	def draw_figure(self, row, column):
-		"""Draws a figure in center of defined row and column of the field."""
-		# Gets the coords of center of the cell
-		x = column * self.cell_size + self.cell_size // 2 + self.line_width * column
-		y = row * self.cell_size + self.cell_size // 2 + self.line_width * row
-
-		# Draws the figure
-		self.canvas.create_text(
-			x, y, font=f'Raleway {self.figure_size} bold',
-			text=self.game_field.current_player
-		)
+		return masks
 
-	def field_click(self, event):
-		"""Handles clicks by field."""
-		# Gets mouse coords
-		mouse_x = event.x
-		mouse_y = event.y
 
-		# Checking that mouse clicked by the dividing lines
-		for coord in self.line_coords:
-			if coord - self.line_width // 2 <= mouse_x <= coord + self.line_width // 2:
-				break
-			elif coord - self.line_width // 2 <= mouse_y <= coord + self.line_width // 2:
-				break
+class RandomPlayer:
+	"""Represents a bot which does random steps."""
 
-		else:
-			# Gets row and column index of cell
-			row = mouse_y // (self.cell_size + self.line_width)
-			column = mouse_x // (self.cell_size + self.line_width)
-
-			# Checking that cell is free
-			if self.game_field.field[row, column] is None:
-				# Drawing player figure
-				self.draw_figure(row, column)
-
-				# Does the game step and gets the winner if there is one
-				winner = self.game_field.step(row, column)
-				# Updates info about the game
-				self.show_game_state(winner=winner)
-
-				# Bot step
-				if self.using_ai and not winner:
-					# Makes a bot step after delay
-					self.window.after(900, self.bot_step)
-					# Turning off the clicks handling by canvas while bot doing the step
-					self.canvas.unbind('<Button-1>')
+	def __init__(self, field, seed=None):
+		"""
+		Initialization of basics parameters.
+		:param field: object of GameField class.
+		:param seed: seed of random generator or None.
+		"""
+		self.field = field
+		self.rng = random.Random(seed)
+
+	def reset(self, seed=None):
+		"""Prepares the bot for a new game on its field with a new seed."""
+		self.rng.seed(seed)
+
+	def step(self):
+		"""Search position for next step."""
+		return self.field.get_random_free_cell(self.rng)
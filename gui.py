@@ -0,0 +1,329 @@
+import queue
+import threading
+import time
+import traceback
+import tkinter as tk
+import tkinter.font as tkfont
+
+from game import GameField, AIPlayer
+
+
+class TicTacToeGame:
+	"""Represents a game process in tic tac toe game."""
+
+	# Interval of checking that the bot found the step, in milliseconds
+	bot_poll_interval = 20
+	# Maximal time of searching of the bot step, in seconds
+	bot_time_limit = 0.9
+
+	def __init__(
+			self, n_players, field_size, window, menu_frame=None, using_ai=False, cell_size=100,
+			win_length=None, bot_delay=300
+		):
+		"""
+		Initialing of basics parameters of playing in tic tac toe.
+		:param n_players: number of players.
+		:param field_size: size of the game field, number of cells in one row.
+		:param window: Tkinter window tk.Tk().
+		:param menu_frame: Menu frame.
+		:param using_ai: if True then all players except the first one are bots with AI.
+		:param cell_size: size of one cell.
+		:param win_length: number of cells in the winning line (field_size by default).
+		:param bot_delay: minimal time of the bot step in milliseconds.
+		"""
+		# tkinter objects
+		self.window = window
+		self.menu_frame = menu_frame
+
+		# Settings of the players
+		self.n_players = n_players
+		self.using_ai = using_ai
+		self.bot_delay = bot_delay
+
+		# Number of the current bot step, it is changed to cancel the step
+		self.bot_task = 0
+		# Id of scheduled checking of the bot step
+		self.bot_poll_id = None
+		# Event which stops the search of the current bot step
+		self.bot_stop_event = None
+
+		# Sizes
+		self.cell_size = cell_size
+		self.field_size = field_size
+		self.win_length = win_length
+		self.figure_size = self.cell_size // 2
+		self.line_width = self.cell_size // 10
+		self.canvas_size = self.field_size * self.cell_size + (self.field_size-1) * self.line_width
+
+		# Colors
+		self.line_color = '#000'
+
+		# Canvas items of the figures and line coords
+		self.figures = list()
+		self.line_coords = [
+			(self.cell_size + self.line_width) * coord - self.line_width // 2
+			for coord in range(1, self.field_size)
+		]
+
+		# Symbols of the players in the game
+		if self.n_players == 2:
+			# Classic symbols of tic tac toe game
+			self.player_list = ['X', 'O']
+		else:
+			# Numbers (0, 1, 2, ...)
+			self.player_list = list(range(self.n_players))
+
+		# Game field
+		self.game_field = GameField(
+			size=self.field_size, n_players=self.n_players, player_list=self.player_list,
+			win_length=self.win_length
+		)
+
+		# AI player, it does steps of all bots
+		if self.using_ai:
+			self.bot = AIPlayer(field=self.game_field, time_limit=self.bot_time_limit)
+
+		# Creating widgets
+		# tkinter variables
+		self.var_game_state = tk.StringVar(self.window, '')
+
+		# tkinter widgets
+		# Main frame which contains all widgets
+		self.main_frame = tk.Frame(self.window)
+
+		# Contains the state of the game
+		self.game_state_lbl = tk.Label(
+			self.main_frame, textvariable=self.var_game_state, font='Raleway 20'
+		)
+		self.game_state_lbl.pack(pady=10, ipadx=10)
+
+		# Frame with buttons
+		self.buttons_frame = tk.Frame(self.main_frame)
+
+		self.button_close = tk.Button(
+			self.buttons_frame, text='Закончить игру', font='Arial 10', command=self.close_the_game
+		)
+		self.button_restart = tk.Button(
+			self.buttons_frame, text='Играть заново', font='Arial 10', command=self.restart_the_game
+		)
+		self.button_close.grid(row=0, column=0, padx=(0, 3))
+		self.button_restart.grid(row=0, column=1, padx=(3, 0))
+
+		# Canvas with the game field
+		self.canvas = tk.Canvas(
+			self.main_frame, width=self.canvas_size, height=self.canvas_size, bg='#fff'
+		)
+		self.canvas.pack()
+
+		# Binding the clicks by field to self.field_click function
+		self.canvas.bind('<Button-1>', self.field_click)
+
+		# Drawing the game grid, it is not changed during the game
+		for coord in self.line_coords:
+			self.canvas.create_line(
+				0, coord, self.canvas_size + 1, coord, width=self.line_width, fill=self.line_color
+			)
+			self.canvas.create_line(
+				coord, 0, coord, self.canvas_size + 1, width=self.line_width, fill=self.line_color
+			)
+
+		# Font of the figures
+		self.figure_font = tkfont.Font(
+			self.window, family='Raleway', size=self.figure_size, weight='bold'
+		)
+
+	def start_the_game(self):
+		"""Start the game!"""
+		# Shows fram with the game
+		self.main_frame.pack()
+		# Updating info about the game
+		self.show_game_state(winner=None)
+
+	def close_the_game(self):
+		"""Close the game."""
+		self.cancel_bot_step()
+
+		# Closes frame with the game
+		self.main_frame.pack_forget()
+
+		# If main menu frame exist then...
+		if self.menu_frame is not None:
+			# Show the main menu
+			self.menu_frame.pack(ipadx=10, ipady=10)
+		else:
+			# Close the window
+			self.window.destroy()
+
+	def restart_the_game(self):
+		"""Restarts the game."""
+		self.cancel_bot_step()
+
+		# Hide the buttons frame
+		self.buttons_frame.pack_forget()
+
+		# Clearing the game field, the AI player keeps playing on it
+		self.game_field.reset()
+
+		# Removing the figures, the grid stays on the canvas
+		self.canvas.delete(*self.figures)
+		self.figures.clear()
+
+		# Binding the clicks by field to self.field_click function
+		self.canvas.bind('<Button-1>', self.field_click)
+
+		# Updating info about the game
+		self.show_game_state(winner=None)
+
+	def show_game_state(self, winner=None):
+		"""Shows the info of the game or the winner if there is one."""
+		# Checking the state of the game
+		if winner is not None:
+			# Game over
+			self.canvas.unbind('<Button-1>')
+			self.buttons_frame.pack(after=self.game_state_lbl, pady=(0, 10))
+
+			if winner == -1:
+				# Dead heat
+				self.var_game_state.set('Ничья!')
+			else:
+				# We have a winner
+				self.var_game_state.set(f'Выиграл игрок: {winner}!')
+
+		else:
+			# Updates the text of current player
+			self.var_game_state.set(f'Сейчас xодит игрок: {self.game_field.current_player}')
+
+	def start_bot_step(self):
+		"""Starts searching of the bot step in the background thread."""
+		# Turning off the clicks handling by canvas while bot doing the step
+		self.canvas.unbind('<Button-1>')
+
+		self.bot_task += 1
+		bot = self.bot
+		results = queue.Queue(maxsize=1)
+		# Each search has its own event, so a cancelled search never runs again
+		stop_event = self.bot_stop_event = threading.Event()
+
+		def search():
+			try:
+				results.put(bot.step(stop_event=stop_event))
+			except Exception as error:
+				results.put(error)
+
+		threading.Thread(target=search, daemon=True).start()
+
+		self.bot_poll_id = self.window.after(
+			self.bot_poll_interval, self.poll_bot_step, self.bot_task, results, time.perf_counter()
+		)
+
+	def poll_bot_step(self, task, results, start):
+		"""Does the bot step if it is found and the minimal delay passed."""
+		# The step was cancelled
+		if task != self.bot_task:
+			return
+
+		elapsed = (time.perf_counter() - start) * 1000
+		if results.empty() or elapsed < self.bot_delay:
+			self.bot_poll_id = self.window.after(
+				self.bot_poll_interval, self.poll_bot_step, task, results, start
+			)
+			return
+
+		self.bot_poll_id = None
+		result = results.get()
+		if isinstance(result, Exception):
+			# An exception raised here is only printed by Tk and the field stays
+			# unbound, so the error is printed and the bot does a random step
+			traceback.print_exception(result)
+			result = self.game_field.get_random_free_cell()
+
+		self.bot_step(*result)
+
+	def cancel_bot_step(self):
+		"""Cancels searching of the bot step."""
+		self.bot_task += 1
+
+		if self.bot_poll_id is not None:
+			self.window.after_cancel(self.bot_poll_id)
+			self.bot_poll_id = None
+
+		# Stopping the search, its result is ignored. The next search of the bot
+		# waits until this one is over, they share the engine.
+		if self.bot_stop_event is not None:
+			self.bot_stop_event.set()
+			self.bot_stop_event = None
+
+	def bot_step(self, ai_row, ai_column):
+		"""Does the bot step."""
+		# Drawing bot figure
+		self.draw_figure(ai_row, ai_column)
+		# Does the game step and gets the winner if there is one
+		winner = self.game_field.step(ai_row, ai_column)
+
+		if winner is None and self.game_field.current_index != 0:
+			# The next player is a bot too
+			self.start_bot_step()
+		else:
+			# Player may do his step again
+			self.canvas.bind('<Button-1>', self.field_click)
+
+		# Updates info about the game
+		self.show_game_state(winner=winner)
+
+	def draw_figure(self, row, column):
+		"""Draws a figure in center of defined row and column of the field."""
+		# Gets the coords of center of the cell
+		x = column * self.cell_size + self.cell_size // 2 + self.line_width * column
+		y = row * self.cell_size + self.cell_size // 2 + self.line_width * row
+
+		# Draws the figure
+		figure = self.canvas.create_text(
+			x, y, font=self.figure_font, text=self.game_field.current_player
+		)
+		self.figures.append(figure)
+
+	def get_cell_index(self, coord):
+		"""Returns index of row or column by mouse coord or None if it is on the dividing line."""
+		# Distance between beginnings of two neighbour cells
+		step = self.cell_size + self.line_width
+		index, offset = divmod(coord, step)
+		half_width = self.line_width // 2
+
+		# Dividing line before the cell
+		if offset == 0 and 0 < index < self.field_size:
+			return None
+		# Dividing line after the cell
+		if offset >= step - 2 * half_width and index < self.field_size - 1:
+			return None
+		# Outside of the field
+		if not 0 <= index < self.field_size:
+			return None
+
+		return index
+
+	def field_click(self, event):
+		"""Handles clicks by field."""
+		# Gets mouse coords
+		mouse_x = event.x
+		mouse_y = event.y
+
+		# Gets row and column index of cell
+		row = self.get_cell_index(mouse_y)
+		column = self.get_cell_index(mouse_x)
+
+		# Checking that mouse clicked by the cell and not by the dividing lines
+		if row is not None and column is not None:
+			# Checking that cell is free
+			if self.game_field.is_free(row, column):
+				# Drawing player figure
+				self.draw_figure(row, column)
+
+				# Does the game step and gets the winner if there is one
+				winner = self.game_field.step(row, column)
+				# Updates info about the game
+				self.show_game_state(winner=winner)
+
+				# Bot step
+				if self.using_ai and winner is None:
+					# Searches a bot step in background
+					self.start_bot_step()
@@ -0,0 +1,419 @@
+"""
+Opt-in instrumentation of the engine and AI hot paths.
+
+enable() replaces the instrumented methods (GameField.step, get_winner,
+AIPlayer.step, SearchEngine.search, ...) by wrappers which collect latency
+histograms, numbers of searched positions, hit rates of the transposition table
+and numbers of steps of finished games. disable() restores the original methods,
+so instrumentation costs nothing while it is disabled. snapshot() returns the
+collected metrics as a JSON-compatible dict.
+
+SamplingProfiler periodically samples the stack of a thread and saves stacks in
+folded format ("file:function;file:function count" per line), which is accepted
+by flamegraph.pl and speedscope.
+Self-play profile: python instrumentation.py ai:max_depth=3 --size 5 --win-length 4
+--games 10 --snapshot metrics.json --profile selfplay.folded
+"""
+import argparse
+import bisect
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from bitboard import BitboardGameField
+from game import GameField, AIPlayer
+from maxn import MaxnEngine
+from mcts import MCTSPlayer
+from search import SearchEngine
+
+
+# Upper bounds of buckets of latency histograms in seconds: 1 us, 2 us, 4 us, ... ~1 hour
+LATENCY_BOUNDS = [1e-6 * 2 ** power for power in range(32)]
+# Upper bounds of buckets of count histograms: 1, 2, 4, ... ~1e9
+COUNT_BOUNDS = [2 ** power for power in range(31)]
+
+# Collected metrics or None if instrumentation is disabled
+_registry = None
+# Replaced methods (owner class, name, original method)
+_patches = list()
+
+
+class Histogram:
+	"""Represents a histogram with exponential buckets."""
+
+	def __init__(self, bounds):
+		"""
+		Initialization of basics parameters.
+		:param bounds: sorted upper bounds of the buckets, values greater than the last
+		bound are counted in the extra bucket.
+		"""
+		self.bounds = bounds
+		self.counts = [0] * (len(bounds) + 1)
+		self.count = 0
+		self.total = 0
+		self.min = None
+		self.max = None
+		self.lock = threading.Lock()
+
+	def add(self, value):
+		"""Adds the value to the histogram."""
+		bucket = bisect.bisect_left(self.bounds, value)
+
+		with self.lock:
+			self.counts[bucket] += 1
+			self.count += 1
+			self.total += value
+			if self.min is None or value < self.min:
+				self.min = value
+			if self.max is None or value > self.max:
+				self.max = value
+
+	def get_percentile(self, percentile):
+		"""Returns the upper bound of the bucket which contains the percentile or None."""
+		if not self.count:
+			return None
+
+		rank = self.count * percentile / 100
+		seen = 0
+		for bucket, count in enumerate(self.counts):
+			seen += count
+			if seen >= rank and count:
+				return self.bounds[bucket] if bucket < len(self.bounds) else self.max
+
+		return self.max
+
+	def to_dict(self):
+		"""Returns the summary of the histogram and non-empty buckets."""
+		return {
+			'count': self.count,
+			'sum': self.total,
+			'min': self.min,
+			'max': self.max,
+			'mean': self.total / self.count if self.count else None,
+			'p50': self.get_percentile(50),
+			'p90': self.get_percentile(90),
+			'p99': self.get_percentile(99),
+			'buckets': {
+				str(self.bounds[bucket]) if bucket < len(self.bounds) else 'inf': count
+				for bucket, count in enumerate(self.counts) if count
+			},
+		}
+
+
+class Registry:
+	"""Represents collected histograms and counters."""
+
+	def __init__(self):
+		self.histograms = dict()
+		self.counters = Counter()
+		self.lock = threading.Lock()
+
+	def histogram(self, name, bounds=LATENCY_BOUNDS):
+		"""Returns the histogram by its name, it is created by the first call."""
+		with self.lock:
+			if name not in self.histograms:
+				self.histograms[name] = Histogram(bounds)
+			return self.histograms[name]
+
+	def increment(self, name, value=1):
+		"""Increases the counter by value."""
+		with self.lock:
+			self.counters[name] += value
+
+	def to_dict(self):
+		"""Returns all metrics and hit rates of caches."""
+		rates = dict()
+		for name in self.counters:
+			if name.endswith('.hits'):
+				prefix = name[:-len('.hits')]
+				lookups = self.counters[name] + self.counters[prefix + '.misses']
+				rates[prefix + '.hit_rate'] = self.counters[name] / lookups if lookups else None
+
+		return {
+			'time': time.time(),
+			'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+			'counters': dict(self.counters),
+			'rates': rates,
+		}
+
+
+def is_enabled():
+	"""Returns True if instrumentation is enabled."""
+	return _registry is not None
+
+
+def enable():
+	"""Enables instrumentation, collected metrics are cleared."""
+	global _registry
+
+	if _registry is not None:
+		disable()
+
+	_registry = Registry()
+
+	patch(GameField, 'step', instrument_step)
+	patch(GameField, 'get_winner', instrument_latency('field.get_winner'))
+	patch(BitboardGameField, 'get_winner', instrument_latency('field.get_winner'))
+	patch(AIPlayer, 'step', instrument_latency('ai.step'))
+	patch(MCTSPlayer, 'step', instrument_mcts_step)
+	patch(SearchEngine, 'search', instrument_search('search'))
+	patch(MaxnEngine, 'search', instrument_search('maxn'))
+
+
+def disable():
+	"""Disables instrumentation and restores the original methods."""
+	global _registry
+
+	while _patches:
+		owner, name, original = _patches.pop()
+		setattr(owner, name, original)
+
+	_registry = None
+
+
+def snapshot():
+	"""Returns collected metrics as JSON-compatible dict or None if instrumentation is disabled."""
+	return _registry.to_dict() if _registry is not None else None
+
+
+def save_snapshot(path):
+	"""Saves collected metrics to JSON file."""
+	with open(path, 'w') as file:
+		json.dump(snapshot(), file, indent=2)
+
+
+def patch(owner, name, make_wrapper):
+	"""Replaces method name of class owner by make_wrapper(original method)."""
+	original = owner.__dict__[name]
+	_patches.append((owner, name, original))
+	setattr(owner, name, functools.wraps(original)(make_wrapper(original)))
+
+
+def instrument_latency(name):
+	"""Returns the function which wraps the method to measure its latency."""
+	def make_wrapper(method):
+		histogram = _registry.histogram(name)
+
+		def wrapper(*args, **kwargs):
+			start = time.perf_counter()
+			try:
+				return method(*args, **kwargs)
+			finally:
+				histogram.add(time.perf_counter() - start)
+
+		return wrapper
+
+	return make_wrapper
+
+
+def instrument_step(method):
+	"""Wraps GameField.step() to measure its latency and number of steps of finished games."""
+	registry = _registry
+	histogram = registry.histogram('field.step')
+	steps_histogram = registry.histogram('game.steps', COUNT_BOUNDS)
+
+	def wrapper(self, row, column):
+		start = time.perf_counter()
+		winner = method(self, row, column)
+		histogram.add(time.perf_counter() - start)
+
+		if winner is not None:
+			steps_histogram.add(len(self.history))
+			registry.increment('game.finished')
+
+		return winner
+
+	return wrapper
+
+
+def instrument_mcts_step(method):
+	"""Wraps MCTSPlayer.step() to measure its latency and number of playouts."""
+	registry = _registry
+	histogram = registry.histogram('mcts.step')
+	playouts_histogram = registry.histogram('mcts.playouts', COUNT_BOUNDS)
+
+	def wrapper(self):
+		start = time.perf_counter()
+		result = method(self)
+		histogram.add(time.perf_counter() - start)
+		playouts_histogram.add(self.n_playouts)
+		registry.increment('mcts.playouts', self.n_playouts)
+
+		return result
+
+	return wrapper
+
+
+def instrument_search(prefix):
+	"""
+	Returns the function which wraps search() of the engine to measure its latency,
+	number of searched positions and lookups of the transposition table.
+	"""
+	def make_wrapper(method):
+		registry = _registry
+		histogram = registry.histogram(f'{prefix}.latency')
+		nodes_histogram = registry.histogram(f'{prefix}.nodes', COUNT_BOUNDS)
+
+		def wrapper(self, *args, **kwargs):
+			table = getattr(self, 'table', None)
+			if table is not None:
+				hits, misses = table.hits, table.misses
+
+			start = time.perf_counter()
+			result = method(self, *args, **kwargs)
+			histogram.add(time.perf_counter() - start)
+
+			nodes_histogram.add(self.nodes)
+			registry.increment(f'{prefix}.nodes', self.nodes)
+
+			if table is not None:
+				registry.increment(f'{prefix}.table.hits', table.hits - hits)
+				registry.increment(f'{prefix}.table.misses', table.misses - misses)
+
+			return result
+
+		return wrapper
+
+	return make_wrapper
+
+
+class SamplingProfiler:
+	"""Represents a profiler which samples the stack of a thread in the background."""
+
+	def __init__(self, interval=0.001, thread_id=None):
+		"""
+		Initialization of basics parameters.
+		:param interval: time between samples in seconds.
+		:param thread_id: id of the sampled thread, the current thread by default.
+		"""
+		self.interval = interval
+		self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+
+		# Number of samples of each stack
+		self.stacks = Counter()
+		self.n_samples = 0
+
+		self.stopped = threading.Event()
+		self.thread = None
+		self.switch_interval = None
+
+	def __enter__(self):
+		self.start()
+		return self
+
+	def __exit__(self, *exc_info):
+		self.stop()
+
+	def start(self):
+		"""Starts sampling in the background thread."""
+		# The sampling thread must get the GIL at least once per interval
+		self.switch_interval = sys.getswitchinterval()
+		sys.setswitchinterval(min(self.switch_interval, self.interval))
+
+		self.stopped.clear()
+		self.thread = threading.Thread(target=self.run, daemon=True)
+		self.thread.start()
+
+	def stop(self):
+		"""Stops sampling."""
+		self.stopped.set()
+		if self.thread is not None:
+			self.thread.join()
+			self.thread = None
+			sys.setswitchinterval(self.switch_interval)
+
+	def run(self):
+		"""Samples the stack until the profiler is stopped."""
+		while not self.stopped.wait(self.interval):
+			frame = sys._current_frames().get(self.thread_id)
+			if frame is None:
+				continue
+
+			stack = list()
+			while frame is not None:
+				code = frame.f_code
+				stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+				frame = frame.f_back
+
+			self.stacks[';'.join(reversed(stack))] += 1
+			self.n_samples += 1
+
+	def get_folded(self):
+		"""Returns lines of stacks in folded format, the root function goes first."""
+		return [f'{stack} {count}' for stack, count in self.stacks.most_common()]
+
+	def save(self, path):
+		"""Saves stacks in folded format."""
+		with open(path, 'w') as file:
+			file.write('\n'.join(self.get_folded()) + '\n')
+
+
+def main():
+	from tournament import PLAYER_CLASSES, parse_player, run_tournament
+
+	parser = argparse.ArgumentParser(description='Profiles self-play of a bot.')
+	parser.add_argument(
+		'player', help=f"bot: {', '.join(PLAYER_CLASSES)}, parameters as 'ai:max_depth=2'"
+	)
+	parser.add_argument('--size', type=int, default=3, help='size of game field')
+	parser.add_argument('--n-players', type=int, default=2, help='number of players in a game')
+	parser.add_argument(
+		'--win-length', type=int, help='number of cells in the winning line (size by default)'
+	)
+	parser.add_argument('--games', type=int, default=10, help='number of games')
+	parser.add_argument('--seed', type=int, default=0, help='seed of the games')
+	parser.add_argument(
+		'--random-openings', type=int, default=0, help='number of random steps in each game'
+	)
+	parser.add_argument('--snapshot', help='JSON file for metrics')
+	parser.add_argument('--profile', help='file for stacks in folded format (flame graph)')
+	parser.add_argument(
+		'--interval', type=float, default=0.001, help='time between samples in seconds'
+	)
+	args = parser.parse_args()
+
+	parse_player(args.player)
+	enable()
+
+	# All participants are the same bot, a round contains games with all their seatings
+	specs = [args.player] * args.n_players
+	n_rounds = max(1, args.games // math.factorial(args.n_players))
+
+	profiler = SamplingProfiler(args.interval) if args.profile else None
+	if profiler is not None:
+		profiler.start()
+
+	try:
+		run_tournament(
+			specs, size=args.size, n_players=args.n_players, win_length=args.win_length,
+			n_rounds=n_rounds, seed=args.seed, random_openings=args.random_openings
+		)
+	finally:
+		if profiler is not None:
+			profiler.stop()
+
+	metrics = snapshot()
+	for name, histogram in metrics['histograms'].items():
+		if not histogram['count']:
+			continue
+		print(
+			f"{name:<20}{histogram['count']:>10}  mean {histogram['mean']:.6g}"
+			f"  p50 {histogram['p50']:.6g}  p99 {histogram['p99']:.6g}"
+		)
+	for name, rate in metrics['rates'].items():
+		print(f"{name:<20}{rate if rate is not None else 0:>10.1%}")
+
+	if args.snapshot:
+		save_snapshot(args.snapshot)
+	if profiler is not None:
+		profiler.save(args.profile)
+		print(f"{profiler.n_samples} samples saved to {args.profile}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,67 @@
+# Cache of lines for every size of the field and length of winning line
+_lines_cache = dict()
+# Cache of line masks for every size of the field and length of winning line
+_line_masks_cache = dict()
+
+# Directions of lines: right, down, down-right and down-left
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def get_lines(size, win_length=None):
+	"""
+	Returns all winning lines of the field of the given size.
+	:param size: size of game field.
+	:param win_length: number of cells in the winning line (size by default).
+	:return tuple (lines, cell_lines), where lines is a list of lists of cells
+	(row * size + column) of each line of win_length cells in rows, columns and all
+	diagonals, and cell_lines[cell] is a list of indices of lines which contain the cell.
+	"""
+	win_length = win_length or size
+
+	if (size, win_length) not in _lines_cache:
+		lines = list()
+
+		for row_step, column_step in DIRECTIONS:
+			for row in range(size):
+				for column in range(size):
+					# Last cell of the line must be inside of the field
+					last_row = row + row_step * (win_length - 1)
+					last_column = column + column_step * (win_length - 1)
+
+					if 0 <= last_row < size and 0 <= last_column < size:
+						lines.append([
+							(row + row_step * index) * size + column + column_step * index
+							for index in range(win_length)
+						])
+
+		cell_lines = [list() for _ in range(size * size)]
+		for index, line in enumerate(lines):
+			for cell in line:
+				cell_lines[cell].append(index)
+
+		_lines_cache[size, win_length] = (lines, cell_lines)
+
+	return _lines_cache[size, win_length]
+
+
+def get_line_masks(size, win_length=None):
+	"""
+	Returns precomputed line masks for the field of the given size.
+	:param size: size of game field.
+	:param win_length: number of cells in the winning line (size by default).
+	:return tuple (lines, cell_lines), where lines is a list of masks of all winning
+	lines and cell_lines[cell] is a list of masks of lines which contain the cell
+	with index cell (row * size + column).
+	"""
+	win_length = win_length or size
+
+	if (size, win_length) not in _line_masks_cache:
+		cells_of_lines, line_indices = get_lines(size, win_length)
+		lines = [sum(1 << cell for cell in line) for line in cells_of_lines]
+
+		# Masks of lines of each cell by their indices, without testing all lines
+		cell_lines = [[lines[index] for index in indices] for indices in line_indices]
+
+		_line_masks_cache[size, win_length] = (lines, cell_lines)
+
+	return _line_masks_cache[size, win_length]
@@ -1,5 +1,11 @@
-import menu
+def main():
+	"""Starts the game with GUI."""
+	# GUI is imported only here, so the game logic can be used without display
+	import menu
 
-if __name__ == '__main__':
 	menu.show_main_menu()
 	menu.window.mainloop()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,284 @@
+import threading
+import time
+
+from evaluation import PatternEvaluator
+from lines import get_line_masks
+
+
+# Sum of values of all players in each position
+TOTAL = 1_000_000
+
+
+class MaxnEngine:
+	"""
+	Represents a search for N players. In max^n mode each player maximizes his own
+	value, values of all players sum up to TOTAL, which allows shallow pruning.
+	In paranoid mode all opponents minimize the value of the searching player
+	(alpha-beta pruning). Positions are lists of bitmasks of cells of each player,
+	players do steps in order of their indices.
+	"""
+
+	def __init__(
+			self, size, n_players, win_length=None, max_depth=3, max_nodes=5000,
+			time_limit=None, paranoid=False
+		):
+		"""
+		Initialization of basics parameters.
+		:param size: size of game field.
+		:param n_players: number of players.
+		:param win_length: number of cells in the winning line (size by default).
+		:param max_depth: maximal depth of the search.
+		:param max_nodes: maximal number of searched positions per move or None.
+		:param time_limit: maximal time of search per move in seconds or None.
+		:param paranoid: if True then opponents play against the searching player.
+		"""
+		self.size = size
+		self.n_players = n_players
+		self.win_length = win_length or size
+		self.max_depth = max_depth
+		self.max_nodes = max_nodes
+		self.time_limit = time_limit
+		self.paranoid = paranoid
+
+		self.lines, self.cell_lines = get_line_masks(size, self.win_length)
+		self.full_mask = (1 << (size * size)) - 1
+
+		# Masks of cells around each cell
+		self.neighbours = list()
+		for cell in range(size * size):
+			row, column = divmod(cell, size)
+			mask = 0
+			for neighbour_row in range(max(0, row - 1), min(size, row + 2)):
+				for neighbour_column in range(max(0, column - 1), min(size, column + 2)):
+					mask |= 1 << (neighbour_row * size + neighbour_column)
+			self.neighbours.append(mask)
+
+		# Value of the line with n cells of one player
+		self.line_values = [1] + [4 ** count for count in range(1, self.win_length)]
+		# Evaluation of the searched position, it is updated by each step of the search
+		self.evaluator = PatternEvaluator(size, n_players, self.win_length, base=4)
+
+		# Search state
+		self.nodes = 0
+		self.stopped = False
+		self.deadline = None
+		# Event of the current search, it is set by stop()
+		self.stop_event = threading.Event()
+		# Searches share the evaluator, so they run one by one
+		self.lock = threading.Lock()
+
+	def search(self, masks, index, time_limit=None, stop_event=None):
+		"""
+		Searches the best step of the player to move.
+		:param masks: list of masks of cells of each player.
+		:param index: index of the player to move.
+		:param time_limit: maximal time of the search in seconds, self.time_limit by default.
+		:param stop_event: threading.Event which stops this search when it is set or None
+		for a new event. The search waits until the previous search of the engine is over.
+		:return tuple (cell, values), where cell is row * size + column and values
+		is a list of values of the players.
+		"""
+		with self.lock:
+			self.stop_event = stop_event if stop_event is not None else threading.Event()
+			return self.search_root(masks, index, time_limit)
+
+	def search_root(self, masks, index, time_limit):
+		"""Searches steps of the root position, the lock of the engine is held."""
+		self.nodes = 0
+		self.stopped = False
+		time_limit = time_limit if time_limit is not None else self.time_limit
+		self.deadline = time.perf_counter() + time_limit if time_limit else None
+
+		masks = list(masks)
+		filled = 0
+		for mask in masks:
+			filled |= mask
+
+		# Setting cells of the position to the evaluator
+		self.evaluator.reset()
+		for player, mask in enumerate(masks):
+			while mask:
+				bit = mask & -mask
+				self.evaluator.add(bit.bit_length() - 1, player)
+				mask ^= bit
+
+		best_cell = None
+		best_values = None
+
+		for cell in self.order_moves(masks, filled, index):
+			masks[index] |= 1 << cell
+			self.evaluator.add(cell, index)
+
+			if self.paranoid:
+				value = self.paranoid_search(
+					masks, filled | 1 << cell, (index + 1) % self.n_players, cell,
+					self.max_depth - 1, -1, TOTAL + 1, index
+				)
+				values = [value if player == index else None for player in range(self.n_players)]
+			else:
+				values = self.maxn(
+					masks, filled | 1 << cell, (index + 1) % self.n_players, cell,
+					self.max_depth - 1, best_values[index] if best_values is not None else 0
+				)
+
+			masks[index] ^= 1 << cell
+			self.evaluator.remove(cell, index)
+
+			# Moves searched after the budget is exhausted are not reliable
+			if self.stopped and best_cell is not None:
+				break
+
+			if best_values is None or values[index] > best_values[index]:
+				best_cell = cell
+				best_values = values
+
+		return best_cell, best_values
+
+	def stop(self):
+		"""Stops the current search, it may be called from another thread."""
+		self.stop_event.set()
+
+	def get_terminal_values(self, masks, filled, last_cell, index):
+		"""
+		Returns values of the players if the game is over or None.
+		:param index: index of the player to move, the previous one did the step to last_cell.
+		"""
+		last_index = (index - 1) % self.n_players
+		mask = masks[last_index]
+
+		# The last step won the game
+		for line in self.cell_lines[last_cell]:
+			if mask & line == line:
+				return [TOTAL if player == last_index else 0 for player in range(self.n_players)]
+
+		# Field filled
+		if filled == self.full_mask:
+			return [TOTAL // self.n_players] * self.n_players
+
+		return None
+
+	def maxn(self, masks, filled, index, last_cell, depth, bound):
+		"""
+		Returns values of the players in the position.
+		:param index: index of the player to move.
+		:param bound: the parent player has this value, so the position is not interesting
+		for him if the player to move gets more than TOTAL - bound.
+		"""
+		self.nodes += 1
+
+		values = self.get_terminal_values(masks, filled, last_cell, index)
+		if values is not None:
+			return values
+
+		if depth <= 0 or self.is_out_of_budget():
+			return self.evaluate()
+
+		best_values = None
+
+		for cell in self.order_moves(masks, filled, index):
+			masks[index] |= 1 << cell
+			self.evaluator.add(cell, index)
+			values = self.maxn(
+				masks, filled | 1 << cell, (index + 1) % self.n_players, cell, depth - 1,
+				best_values[index] if best_values is not None else 0
+			)
+			masks[index] ^= 1 << cell
+			self.evaluator.remove(cell, index)
+
+			if best_values is None or values[index] > best_values[index]:
+				best_values = values
+
+			# Shallow pruning: the parent player will not choose this position
+			if best_values[index] >= TOTAL - bound:
+				break
+
+		return best_values
+
+	def paranoid_search(self, masks, filled, index, last_cell, depth, alpha, beta, root_index):
+		"""Returns the value of the position for player root_index (alpha-beta search)."""
+		self.nodes += 1
+
+		values = self.get_terminal_values(masks, filled, last_cell, index)
+		if values is not None:
+			return values[root_index]
+
+		if depth <= 0 or self.is_out_of_budget():
+			return self.evaluate()[root_index]
+
+		maximizing = index == root_index
+		best_value = -1 if maximizing else TOTAL + 1
+
+		for cell in self.order_moves(masks, filled, index):
+			masks[index] |= 1 << cell
+			self.evaluator.add(cell, index)
+			value = self.paranoid_search(
+				masks, filled | 1 << cell, (index + 1) % self.n_players, cell, depth - 1,
+				alpha, beta, root_index
+			)
+			masks[index] ^= 1 << cell
+			self.evaluator.remove(cell, index)
+
+			if maximizing:
+				best_value = max(best_value, value)
+				alpha = max(alpha, value)
+			else:
+				best_value = min(best_value, value)
+				beta = min(beta, value)
+
+			if alpha >= beta:
+				break
+
+		return best_value
+
+	def order_moves(self, masks, filled, index):
+		"""
+		Returns empty cells near the filled ones in order of searching: steps which
+		complete more of own and others' lines go first.
+		"""
+		if not filled:
+			center = self.size // 2
+			return [center * self.size + center]
+
+		# Empty cells around the filled ones
+		candidates = 0
+		rest = filled
+		while rest:
+			bit = rest & -rest
+			candidates |= self.neighbours[bit.bit_length() - 1]
+			rest ^= bit
+		candidates &= ~filled
+
+		scores = dict()
+		while candidates:
+			bit = candidates & -candidates
+			cell = bit.bit_length() - 1
+			candidates ^= bit
+
+			score = 0
+			for line in self.cell_lines[cell]:
+				owners = [player for player, mask in enumerate(masks) if mask & line]
+				if len(owners) == 1:
+					count = bin(masks[owners[0]] & line).count('1')
+					# Own lines are a bit more important than lines of the opponents
+					score += self.line_values[count] * (2 if owners[0] == index else 1)
+			scores[cell] = score
+
+		return sorted(scores, key=scores.get, reverse=True)
+
+	def evaluate(self):
+		"""Returns heuristic values of the players which sum up to TOTAL."""
+		scores = [score + 1 for score in self.evaluator.scores]
+		total = sum(scores)
+		return [score * TOTAL // total for score in scores]
+
+	def is_out_of_budget(self):
+		"""Returns True if the search must be stopped."""
+		if not self.stopped:
+			if self.stop_event.is_set():
+				self.stopped = True
+			elif self.max_nodes is not None and self.nodes >= self.max_nodes:
+				self.stopped = True
+			elif self.deadline is not None and time.perf_counter() >= self.deadline:
+				self.stopped = True
+
+		return self.stopped
@@ -0,0 +1,206 @@
+import copy
+import math
+import random
+import time
+import multiprocessing
+
+
+class Node:
+	"""Represents a node of the Monte Carlo search tree."""
+
+	__slots__ = ('cell', 'parent', 'player_index', 'children', 'untried', 'visits', 'wins')
+
+	def __init__(self, cell, parent, player_index, untried):
+		"""
+		Initialization of basics parameters.
+		:param cell: cell (row * size + column) of the step which leads to the node.
+		:param parent: parent node or None.
+		:param player_index: index of the player who did the step.
+		:param untried: list of cells of steps which are not expanded yet.
+		"""
+		self.cell = cell
+		self.parent = parent
+		self.player_index = player_index
+		self.children = list()
+		self.untried = untried
+
+		# Number of playouts through the node and sum of their results
+		# for the player who did the step
+		self.visits = 0
+		self.wins = 0.0
+
+	def select_child(self, exploration):
+		"""Returns the child with the greatest UCT value."""
+		log_visits = math.log(self.visits)
+
+		return max(
+			self.children,
+			key=lambda child: child.wins / child.visits
+			+ exploration * math.sqrt(log_visits / child.visits)
+		)
+
+
+def run_search(field, max_playouts=None, time_limit=None, exploration=1.4, seed=None):
+	"""
+	Builds a search tree from the position of the field. The field is changed
+	during the search, but it is returned to the initial position at the end.
+	:param field: object of GameField class.
+	:param max_playouts: maximal number of playouts or None.
+	:param time_limit: maximal time of search in seconds or None.
+	At least one playout is done even if the limits are 0, so the root has a step.
+	:param exploration: exploration parameter of UCT.
+	:param seed: seed of random generator.
+	:return tuple (visits, n_playouts), where visits is a dict of numbers of visits
+	of each step (row * size + column) of the current player.
+	"""
+	if max_playouts is None and time_limit is None:
+		raise ValueError("Search needs max_playouts or time_limit.")
+
+	rng = random.Random(seed)
+	deadline = time.perf_counter() + time_limit if time_limit is not None else None
+
+	root = Node(None, None, None, list(field.free_cells))
+	n_playouts = 0
+
+	while max_playouts is None or n_playouts < max(max_playouts, 1):
+		if n_playouts and deadline is not None and time.perf_counter() >= deadline:
+			break
+
+		node = root
+		n_steps = 0
+
+		# Selection
+		while not node.untried and node.children:
+			node = node.select_child(exploration)
+			field.make_step(*divmod(node.cell, field.size))
+			n_steps += 1
+
+		# Expansion
+		if field.winner is None:
+			position = rng.randrange(len(node.untried))
+			node.untried[position], node.untried[-1] = node.untried[-1], node.untried[position]
+			cell = node.untried.pop()
+
+			player_index = field.current_index
+			field.make_step(*divmod(cell, field.size))
+			n_steps += 1
+
+			child = Node(
+				cell, node, player_index,
+				list(field.free_cells) if field.winner is None else list()
+			)
+			node.children.append(child)
+			node = child
+
+		# Playout
+		while field.winner is None:
+			field.make_step(*field.get_random_free_cell(rng))
+			n_steps += 1
+
+		winner = field.winner
+
+		# Returning the field to the initial position
+		for _ in range(n_steps):
+			field.undo()
+		field.redo_steps.clear()
+
+		# Backpropagation
+		while node is not root:
+			node.visits += 1
+			if winner == -1:
+				node.wins += 0.5
+			elif winner == field.players[node.player_index]:
+				node.wins += 1
+			node = node.parent
+		root.visits += 1
+
+		n_playouts += 1
+
+	visits = {child.cell: child.visits for child in root.children}
+	return visits, n_playouts
+
+
+class MCTSPlayer:
+	"""
+	Represents a bot which searches steps with Monte Carlo tree search (UCT).
+	With n_workers > 1 independent trees are built in a process pool and their
+	numbers of visits are merged (root parallelism).
+	"""
+
+	def __init__(
+			self, field, max_playouts=None, time_limit=1.0, n_workers=1, exploration=1.4, seed=None
+		):
+		"""
+		Initialization of basics parameters.
+		:param field: object of GameField class.
+		:param max_playouts: maximal number of playouts of all workers per step or None.
+		:param time_limit: maximal time of search per step in seconds or None.
+		:param n_workers: number of processes building the trees.
+		:param exploration: exploration parameter of UCT.
+		:param seed: seed of random generator or None.
+		"""
+		self.field = field
+		self.max_playouts = max_playouts
+		self.time_limit = time_limit
+		self.n_workers = n_workers
+		self.exploration = exploration
+		self.rng = random.Random(seed)
+
+		# Process pool is created by the first step
+		self.pool = None
+
+		# Statistics of the last step
+		self.n_playouts = 0
+		self.search_time = 0.0
+
+	@property
+	def playouts_per_second(self):
+		"""Returns the speed of the last step."""
+		return self.n_playouts / self.search_time if self.search_time else 0.0
+
+	def step(self):
+		"""Search position for next step."""
+		start = time.perf_counter()
+
+		if self.max_playouts is not None:
+			max_playouts = math.ceil(self.max_playouts / self.n_workers)
+		else:
+			max_playouts = None
+
+		args = [
+			(self.field, max_playouts, self.time_limit, self.exploration, self.rng.getrandbits(32))
+			for _ in range(self.n_workers)
+		]
+
+		if self.n_workers == 1:
+			# Search changes the field, so the copy is used
+			args[0] = (copy.deepcopy(self.field), ) + args[0][1:]
+			results = [run_search(*args[0])]
+		else:
+			if self.pool is None:
+				self.pool = multiprocessing.Pool(self.n_workers)
+			results = self.pool.starmap(run_search, args)
+
+		# Merging the trees
+		visits = dict()
+		self.n_playouts = 0
+		for tree_visits, n_playouts in results:
+			for cell, n_visits in tree_visits.items():
+				visits[cell] = visits.get(cell, 0) + n_visits
+			self.n_playouts += n_playouts
+
+		self.search_time = time.perf_counter() - start
+
+		cell = max(visits, key=visits.get)
+		return divmod(cell, self.field.size)
+
+	def reset(self, seed=None):
+		"""Prepares the bot for a new game on its field with a new seed, the process pool is kept."""
+		self.rng.seed(seed)
+
+	def close(self):
+		"""Closes the process pool."""
+		if self.pool is not None:
+			self.pool.close()
+			self.pool.join()
+			self.pool = None
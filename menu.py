@@ -1,7 +1,7 @@
 import tkinter as tk
 import time
 
-from game import TicTacToeGame
+from gui import TicTacToeGame
 
 
 def show_main_menu():
@@ -22,7 +22,7 @@ def show_extended_menu():
 	classic_game_menu_frame.pack_forget()
 	extended_game_menu_frame.pack(ipadx=10, ipady=10)
 
-def start_the_game(n_players, field_size, cell_size=100, using_ai=False):
+def start_the_game(n_players, field_size, cell_size=100, using_ai=False, win_length=None):
 	"""Shows the game frame and hides other frames."""
 	main_menu_frame.pack_forget()
 	classic_game_menu_frame.pack_forget()
@@ -30,7 +30,8 @@ def start_the_game(n_players, field_size, cell_size=100, using_ai=False):
 	
 	game = TicTacToeGame(
 		n_players=n_players, field_size=field_size, window=window,
-		menu_frame=main_menu_frame, using_ai=using_ai, cell_size=cell_size
+		menu_frame=main_menu_frame, using_ai=using_ai, cell_size=cell_size,
+		win_length=win_length
 	)
 	game.start_the_game()
 
@@ -42,6 +43,7 @@ def start_the_extended_game():
 	ent_num_players.update()
 	ent_field_size.update()
 	ent_cell_size.update()
+	ent_win_length.update()
 	# Some delay
 	time.sleep(0.5)
 
@@ -54,7 +56,9 @@ def start_the_extended_game():
 	start_the_game(
 		n_players=int(var_num_players.get()),
 		field_size=int(var_field_size.get()),
-		cell_size=int(var_cell_size.get())
+		cell_size=int(var_cell_size.get()),
+		win_length=int(var_win_length.get()),
+		using_ai=var_using_ai.get()
 	)	
 
 def variables_validator():
@@ -62,6 +66,7 @@ def variables_validator():
 	num_players = var_num_players.get()
 	field_size = var_field_size.get()
 	cell_size = var_cell_size.get()
+	win_length = var_win_length.get()
 
 	if not num_players.isdigit() or int(num_players) < 1:
 		var_num_players.set('2')
@@ -69,12 +74,29 @@ def variables_validator():
 		var_field_size.set('3')
 	if not cell_size.isdigit() or int(cell_size) < 10:
 		var_cell_size.set('10')
+	if not win_length.isdigit() or int(win_length) < 3:
+		var_win_length.set('3')
 
 	num_players = int(var_num_players.get())
 	field_size = int(var_field_size.get())
+	win_length = int(var_win_length.get())
 
 	if num_players >= field_size:
 		var_num_players.set(field_size - 1)
+	if win_length > field_size:
+		var_win_length.set(field_size)
+
+def sync_win_length(*args):
+	"""Keeps the win length equal to the field size until the user changes it."""
+	global last_field_size
+
+	field_size = var_field_size.get()
+	if not field_size.isdigit():
+		return
+
+	if var_win_length.get() == last_field_size:
+		var_win_length.set(field_size)
+	last_field_size = field_size
 
 def decrease_variable(variable):
 	"""Decreases the value of variable."""
@@ -145,6 +167,12 @@ extended_game_menu_frame = tk.Frame(window)
 var_num_players = tk.StringVar(window, '2', name='num_players')
 var_field_size = tk.StringVar(window, '3', name='field_size')
 var_cell_size = tk.StringVar(window, '100', name='cell_size')
+var_win_length = tk.StringVar(window, '3', name='win_length')
+var_using_ai = tk.BooleanVar(window, False, name='using_ai')
+
+# The win length follows the field size (old rules) unless the user changes it
+last_field_size = var_field_size.get()
+var_field_size.trace_add('write', sync_win_length)
 
 # Title of menu
 lbl_ext_gm = tk.Label(extended_game_menu_frame, text='Расширенная игра', font='Arial 30')
@@ -211,12 +239,37 @@ btn_dec_cell_size.pack(side=tk.LEFT, ipadx=7)
 ent_cell_size.pack(side=tk.LEFT, fill=tk.BOTH)
 btn_inc_cell_size.pack(side=tk.LEFT, ipadx=7)
 
+# Row with length of winning line setting
+lbl_win_length = tk.Label(frm_params, text='Длина линии', font='Arial 10')
+frm_win_length = tk.Frame(frm_params)
+
+lbl_win_length.grid(row=3, column=0, sticky='w', padx=8, pady=2)
+frm_win_length.grid(row=3, column=1, sticky='w', padx=8, pady=2)
+
+btn_dec_win_length = tk.Button(
+	frm_win_length, text='-', font='Arial 12', command=lambda: decrease_variable(var_win_length)
+)
+ent_win_length = tk.Entry(frm_win_length, width=10, bd=0, textvariable=var_win_length)
+btn_inc_win_length = tk.Button(
+	frm_win_length, text='+', font='Arial 12', command=lambda: increase_variable(var_win_length)
+)
+
+btn_dec_win_length.pack(side=tk.LEFT, ipadx=7)
+ent_win_length.pack(side=tk.LEFT, fill=tk.BOTH)
+btn_inc_win_length.pack(side=tk.LEFT, ipadx=7)
+
+# Row with bots setting
+chk_using_ai = tk.Checkbutton(
+	frm_params, text='Остальные игроки - боты', font='Arial 10', variable=var_using_ai
+)
+chk_using_ai.grid(row=4, column=0, columnspan=2, sticky='w', padx=4, pady=2)
+
 # Row with buttons
 btn_back = tk.Button(frm_params, text='Назад', font='Arial 10', command=show_main_menu)
 btn_start = tk.Button(frm_params, text='Играть', font='Arial 10', command=start_the_extended_game)
 
-btn_back.grid(row=3, column=0, sticky='e', pady=(5, 0), padx=(0, 3), ipadx=10, ipady=5)
-btn_start.grid(row=3, column=1, sticky='w', pady=(5, 0), padx=(3, 0), ipadx=10, ipady=5)
+btn_back.grid(row=5, column=0, sticky='e', pady=(5, 0), padx=(0, 3), ipadx=10, ipady=5)
+btn_start.grid(row=5, column=1, sticky='w', pady=(5, 0), padx=(3, 0), ipadx=10, ipady=5)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,102 @@
+from game import GameField
+
+
+class FieldPool:
+	"""
+	Represents a bounded pool of fields and their bots. Fields of finished games
+	are reset in place and reused instead of creating new fields and bots for each game.
+	Fields are kept by key (size, n_players, players, win_length, tag), where tag
+	tells which bots are kept with the field.
+	"""
+
+	def __init__(
+			self, max_size=100, field_class=GameField, bot_class=None, max_cost=None, **bot_kwargs
+		):
+		"""
+		Initialization of basics parameters.
+		:param max_size: maximal number of fields kept in the pool.
+		:param field_class: class of the fields (GameField or its subclass).
+		:param bot_class: class of the bots created for each field (AIPlayer) or None.
+		:param max_cost: maximal total cost of fields kept in the pool (see get_cost()) or None,
+		it bounds memory of the pool when fields have different sizes.
+		:param bot_kwargs: parameters of the bots.
+		"""
+		self.max_size = max_size
+		self.field_class = field_class
+		self.bot_class = bot_class
+		self.bot_kwargs = bot_kwargs
+
+		# Lists of free pairs (field, bot) by their keys
+		self.entries = dict()
+		self.n_entries = 0
+		self.max_cost = max_cost
+		self.cost = 0
+
+		# Statistics
+		self.n_created = 0
+		self.n_reused = 0
+
+	def __len__(self):
+		return self.n_entries
+
+	def acquire(self, size=3, n_players=2, player_list=None, win_length=None, tag=None):
+		"""
+		Returns an empty field with the given parameters (see GameField) and its bot.
+		:param tag: hashable key of the bots released with the field or None.
+		:return tuple (field, bot), bot is None if the pool has no class of bots and
+		the field is new. Reused fields come with the bot given to release() with the same tag.
+		"""
+		players = tuple(player_list) if player_list else tuple(range(n_players))
+		entries = self.entries.get((size, n_players, players, win_length or size, tag))
+
+		if entries:
+			field, bot = entries.pop()
+			self.n_entries -= 1
+			self.cost -= self.get_cost(field)
+			self.n_reused += 1
+			return field, bot
+
+		field = self.field_class(
+			size=size, n_players=n_players, player_list=list(players), win_length=win_length
+		)
+		bot = self.bot_class(field, **self.bot_kwargs) if self.bot_class is not None else None
+		self.n_created += 1
+
+		return field, bot
+
+	def release(self, field, bot=None, tag=None):
+		"""
+		Returns the field and its bot to the pool. The field is reset, if the pool
+		is full (by number of fields or by their cost) then the field is dropped.
+		:param bot: bot or any object of bots of the field, it is returned by acquire().
+		:param tag: hashable key of the bots.
+		:return True if the field is kept, False if it is dropped
+		"""
+		cost = self.get_cost(field)
+		if self.n_entries >= self.max_size:
+			return False
+		if self.max_cost is not None and self.cost + cost > self.max_cost:
+			return False
+
+		field.reset()
+
+		key = (field.size, field.n_players, tuple(field.players), field.win_length, tag)
+		self.entries.setdefault(key, list()).append((field, bot))
+		self.n_entries += 1
+		self.cost += cost
+
+		return True
+
+	def clear(self):
+		"""Removes all fields from the pool."""
+		self.entries.clear()
+		self.n_entries = 0
+		self.cost = 0
+
+	@staticmethod
+	def get_cost(field):
+		"""
+		Returns the cost of the field for the memory bound of the pool: number of its
+		cells and line counters of all players, which take most of the memory.
+		"""
+		return field.size * field.size + field.n_players * len(field.lines)
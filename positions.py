@@ -0,0 +1,174 @@
+"""
+Database of positions with statistics of steps from recorded games.
+
+The file starts with HEADER (MAGIC, size, n_players, win_length, number of rows)
+and is followed by rows of ROW_DTYPE sorted by canonical hash of the position and
+by cell of the step. Positions and steps are stored in canonical orientation
+(see zobrist.get_canonical_key()), so symmetric positions share their statistics.
+Build: python positions.py games.rec book.pos --max-plies 8
+"""
+import argparse
+import mmap
+import struct
+
+import numpy as np
+
+from records import read_records, DRAW, NO_WINNER
+from zobrist import get_zobrist_keys, get_symmetries, get_canonical_key
+
+
+MAGIC = b'TTTPOS\x01\x00'
+HEADER = struct.Struct('<8sHHHxxQ')
+
+# Row of the table: results of the step from the position for the player who did it
+ROW_DTYPE = np.dtype([
+	('hash', '<u8'), ('cell', '<u2'), ('wins', '<u4'), ('draws', '<u4'), ('losses', '<u4'),
+])
+
+
+def build_positions(record_path, path, size=3, n_players=2, win_length=None, max_plies=8):
+	"""
+	Aggregates recorded games into the database of positions.
+	:param record_path: path to the file of game records.
+	:param path: path to the database file.
+	:param size: size of game field, games with other settings are skipped.
+	:param n_players: number of players.
+	:param win_length: number of cells in the winning line (size by default).
+	:param max_plies: number of first steps of each game which are saved.
+	:return number of rows
+	"""
+	win_length = win_length or size
+	cell_keys, side_keys = get_zobrist_keys(size, n_players)
+	symmetries = get_symmetries(size)
+
+	# Results [wins, draws, losses] by (canonical hash, canonical cell)
+	stats = dict()
+
+	for record in read_records(record_path):
+		if (record.size, record.n_players, record.win_length) != (size, n_players, win_length):
+			continue
+		if record.winner == NO_WINNER:
+			continue
+
+		# Hashes of the position in all 8 orientations without key of the side to move
+		hashes = [0] * len(symmetries)
+
+		for ply, cell in enumerate(record.steps[:max_plies]):
+			index = ply % n_players
+			position_hashes = [hash_value ^ side_keys[index] for hash_value in hashes]
+			position_hash = min(position_hashes)
+			symmetry = symmetries[position_hashes.index(position_hash)]
+
+			counts = stats.setdefault((position_hash, symmetry[cell]), [0, 0, 0])
+			if record.winner == DRAW:
+				counts[1] += 1
+			elif record.winner == index:
+				counts[0] += 1
+			else:
+				counts[2] += 1
+
+			for number, transform in enumerate(symmetries):
+				hashes[number] ^= cell_keys[index][transform[cell]]
+
+	keys = sorted(stats)
+	rows = np.zeros(len(keys), dtype=ROW_DTYPE)
+	rows['hash'] = [position_hash for position_hash, _ in keys]
+	rows['cell'] = [cell for _, cell in keys]
+
+	counts = np.array([stats[key] for key in keys], dtype=np.uint32).reshape(-1, 3)
+	rows['wins'], rows['draws'], rows['losses'] = counts.T
+
+	with open(path, 'wb') as file:
+		file.write(HEADER.pack(MAGIC, size, n_players, win_length, len(rows)))
+		file.write(rows.tobytes())
+
+	return len(rows)
+
+
+class PositionBook:
+	"""Represents the database of positions opened with mmap."""
+
+	def __init__(self, path):
+		"""
+		Opens the database.
+		:param path: path to the database file.
+		"""
+		with open(path, 'rb') as file:
+			self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+		magic, self.size, self.n_players, self.win_length, n_rows = HEADER.unpack_from(self.mmap)
+		if magic != MAGIC:
+			raise ValueError(f"File {path} is not a database of positions.")
+
+		# Rows are read from the file on demand
+		self.rows = np.frombuffer(self.mmap, dtype=ROW_DTYPE, count=n_rows, offset=HEADER.size)
+		self.hashes = self.rows['hash']
+
+		self.symmetries = get_symmetries(self.size)
+
+	def __len__(self):
+		return len(self.rows)
+
+	def close(self):
+		"""Closes the database."""
+		self.rows = self.hashes = None
+		self.mmap.close()
+
+	def lookup(self, field):
+		"""
+		Returns statistics of steps from the position of the field.
+		:param field: object of GameField class.
+		:return list of tuples (row, column, wins, draws, losses) for the player to move
+		"""
+		if (field.size, field.n_players, field.win_length) != (
+				self.size, self.n_players, self.win_length
+			):
+			return list()
+
+		# Players do steps in order of their indices
+		cells = [
+			(row * field.size + column, number % field.n_players)
+			for number, (row, column) in enumerate(field.history)
+		]
+		position_hash, symmetry = get_canonical_key(
+			field.size, field.n_players, cells, field.current_index
+		)
+
+		# Binary search of rows of the position
+		start = np.searchsorted(self.hashes, position_hash, side='left')
+		end = np.searchsorted(self.hashes, position_hash, side='right')
+
+		# Cell of the field by its canonical cell
+		inverse = {canonical: cell for cell, canonical in enumerate(self.symmetries[symmetry])}
+
+		steps = list()
+		for row in self.rows[start:end]:
+			row_index, column = divmod(inverse[int(row['cell'])], field.size)
+			steps.append((row_index, column, int(row['wins']), int(row['draws']), int(row['losses'])))
+
+		return steps
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Builds the database of positions.')
+	parser.add_argument('records', help='file of game records')
+	parser.add_argument('output', help='database file')
+	parser.add_argument('--size', type=int, default=3, help='size of game field')
+	parser.add_argument('--n-players', type=int, default=2, help='number of players')
+	parser.add_argument(
+		'--win-length', type=int, help='number of cells in the winning line (size by default)'
+	)
+	parser.add_argument(
+		'--max-plies', type=int, default=8, help='number of first steps of each game'
+	)
+	args = parser.parse_args()
+
+	n_rows = build_positions(
+		args.records, args.output, size=args.size, n_players=args.n_players,
+		win_length=args.win_length, max_plies=args.max_plies
+	)
+	print(f"{n_rows} rows saved to {args.output}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,157 @@
+"""
+Compact binary format of game records.
+
+The file starts with MAGIC and is followed by games. Each game is a header
+(size, n_players, win_length, winner, n_steps, length of symbols), JSON list of
+symbols of the players if they are not default (0, 1, 2, ...) and n_steps cells
+(row * size + column) as uint8 or as uint16 if the field has more than 256 cells.
+Winner is the index of the player, DRAW or NO_WINNER.
+"""
+import json
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+from game import GameField
+
+
+# Beginning of the file of game records
+MAGIC = b'TTTR\x01'
+
+# Header of the game
+HEADER = struct.Struct('<BBBbHB')
+
+# Values of winner of the game
+DRAW = -1
+NO_WINNER = -2
+
+
+GameRecord = namedtuple('GameRecord', 'size n_players win_length players winner steps')
+
+
+def get_cell_type(size):
+	"""Returns typecode of array of cells of the field of the given size."""
+	return 'B' if size * size <= 256 else 'H'
+
+
+class RecordWriter:
+	"""Represents a writer which appends games to the file of game records."""
+
+	def __init__(self, path, buffer_size=1 << 20):
+		"""
+		Initialization of basics parameters.
+		:param path: path to the file.
+		:param buffer_size: size of the write buffer in bytes.
+		"""
+		self.file = open(path, 'ab', buffering=buffer_size)
+		self.n_games = 0
+
+		# Writing the beginning of the new file
+		if self.file.tell() == 0:
+			self.file.write(MAGIC)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def write(self, field):
+		"""Writes the game of the field (object of GameField class)."""
+		if field.winner is None:
+			winner = NO_WINNER
+		elif field.winner == -1:
+			winner = DRAW
+		else:
+			winner = field.player_indices[field.winner]
+
+		steps = [row * field.size + column for row, column in field.history]
+
+		self.write_game(
+			field.size, field.n_players, steps, winner, field.players, field.win_length
+		)
+
+	def write_game(self, size, n_players, steps, winner, players=None, win_length=None):
+		"""
+		Writes the game.
+		:param size: size of game field.
+		:param n_players: number of players.
+		:param steps: list of cells (row * size + column) in order of steps.
+		:param winner: index of the winner, DRAW or NO_WINNER.
+		:param players: list of symbols of the players or None for default.
+		:param win_length: number of cells in the winning line (size by default).
+		"""
+		if players is None or list(players) == list(range(n_players)):
+			symbols = b''
+		else:
+			symbols = json.dumps(list(players)).encode()
+
+		cells = array(get_cell_type(size), steps)
+		if sys.byteorder != 'little':
+			cells.byteswap()
+
+		self.file.write(HEADER.pack(
+			size, n_players, win_length or size, winner, len(cells), len(symbols)
+		))
+		self.file.write(symbols)
+		self.file.write(cells.tobytes())
+		self.n_games += 1
+
+	def close(self):
+		"""Flushes the buffer and closes the file."""
+		self.file.close()
+
+
+def read_records(path, buffer_size=1 << 20):
+	"""
+	Reads games from the file one by one.
+	:param path: path to the file.
+	:param buffer_size: size of the read buffer in bytes.
+	:return generator of GameRecord
+	"""
+	with open(path, 'rb', buffering=buffer_size) as file:
+		if file.read(len(MAGIC)) != MAGIC:
+			raise ValueError(f"File {path} is not a file of game records.")
+
+		while True:
+			header = file.read(HEADER.size)
+			if not header:
+				return
+			if len(header) < HEADER.size:
+				raise ValueError(f"File {path} is truncated.")
+
+			size, n_players, win_length, winner, n_steps, n_symbols = HEADER.unpack(header)
+
+			if n_symbols:
+				players = json.loads(file.read(n_symbols))
+			else:
+				players = list(range(n_players))
+
+			cells = array(get_cell_type(size))
+			data = file.read(n_steps * cells.itemsize)
+			if len(data) < n_steps * cells.itemsize:
+				raise ValueError(f"File {path} is truncated.")
+
+			cells.frombytes(data)
+			if sys.byteorder != 'little':
+				cells.byteswap()
+
+			yield GameRecord(size, n_players, win_length, players, winner, cells)
+
+
+def replay(record, n_steps=None):
+	"""
+	Returns the field with steps of the game.
+	:param record: GameRecord.
+	:param n_steps: number of steps to replay or None for all steps.
+	"""
+	field = GameField(
+		size=record.size, n_players=record.n_players, player_list=record.players,
+		win_length=record.win_length
+	)
+
+	for cell in record.steps[:n_steps]:
+		field.step(*divmod(cell, record.size))
+
+	return field
@@ -0,0 +1,381 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from evaluation import PatternEvaluator
+from lines import get_line_masks
+from zobrist import get_zobrist_keys
+
+
+# Value of the won position (increased by number of empty cells to prefer fast wins)
+WIN = 1_000_000
+# Limit of heuristic values, they grow as 10 ** win_length and must stay below WIN
+MAX_HEURISTIC = WIN // 2
+
+# Flags of values in transposition table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class TranspositionTable:
+	"""Represents a bounded table of searched positions with LRU eviction."""
+
+	def __init__(self, max_size=1_000_000):
+		"""
+		Initialization of basics parameters.
+		:param max_size: maximal number of positions in the table.
+		"""
+		self.max_size = max_size
+		self.entries = OrderedDict()
+
+		# Statistics of lookups
+		self.hits = 0
+		self.misses = 0
+
+	def __len__(self):
+		return len(self.entries)
+
+	def get(self, key):
+		"""Returns entry (depth, value, flag, best_move) of the position or None."""
+		entry = self.entries.get(key)
+
+		if entry is None:
+			self.misses += 1
+		else:
+			self.hits += 1
+			self.entries.move_to_end(key)
+
+		return entry
+
+	def put(self, key, entry):
+		"""Saves entry (depth, value, flag, best_move) of the position."""
+		self.entries[key] = entry
+		self.entries.move_to_end(key)
+
+		# Evicting the least recently used position
+		if len(self.entries) > self.max_size:
+			self.entries.popitem(last=False)
+
+	def clear(self):
+		"""Removes all positions from the table."""
+		self.entries.clear()
+
+
+class SearchEngine:
+	"""
+	Represents a negamax search with alpha-beta pruning for two players.
+	Positions are pairs of bitmasks (own, other) of cells of the player to move
+	and of his opponent, as in BitboardGameField. Positions are saved in
+	the transposition table by their Zobrist hashes, as in GameField.hash.
+	"""
+
+	def __init__(
+			self, size, win_length=None, max_depth=4, solve_cells=9, max_nodes=None,
+			time_limit=None, table_size=1_000_000
+		):
+		"""
+		Initialization of basics parameters.
+		:param size: size of game field.
+		:param win_length: number of cells in the winning line (size by default).
+		:param max_depth: maximal depth of the search.
+		:param solve_cells: positions with this or less number of empty cells are searched
+		to the end of the game.
+		:param max_nodes: maximal number of searched positions per move or None.
+		:param time_limit: maximal time of search per move in seconds or None.
+		:param table_size: maximal number of positions in the transposition table.
+		"""
+		self.size = size
+		self.win_length = win_length or size
+		self.max_depth = max_depth
+		self.solve_cells = solve_cells
+		self.max_nodes = max_nodes
+		self.time_limit = time_limit
+
+		self.table = TranspositionTable(table_size)
+		self.cell_keys, self.side_keys = get_zobrist_keys(size, 2)
+		self.lines, self.cell_lines = get_line_masks(size, self.win_length)
+		self.full_mask = (1 << (size * size)) - 1
+
+		# Cells sorted by number of lines which contain them (center and diagonals first)
+		self.cell_order = sorted(
+			range(size * size), key=lambda cell: len(self.cell_lines[cell]), reverse=True
+		)
+
+		# Value of the line with n cells of one player
+		self.line_values = [0] + [10 ** count for count in range(self.win_length)]
+		# Evaluation of the searched position, it is updated by each step of the search
+		self.evaluator = PatternEvaluator(size, 2, self.win_length)
+		self.use_evaluator = False
+
+		# Search state
+		self.nodes = 0
+		self.depth = 0
+		self.stopped = False
+		self.deadline = None
+		# Event of the current search, it is set by stop()
+		self.stop_event = threading.Event()
+		# Searches share the evaluator and the transposition table, so they run one by one
+		self.lock = threading.Lock()
+
+	def search(self, own, other, index=0, key=None, time_limit=None, stop_event=None):
+		"""
+		Searches the best step of the player to move by iterative deepening: the
+		position is searched to depth 1, 2, ... max_depth and each iteration starts
+		from the best steps of the previous one, so a step is ready at any moment
+		and the search returns when the time limit is over.
+		:param own: mask of cells of the player to move.
+		:param other: mask of cells of his opponent.
+		:param index: index of the player to move (0 or 1).
+		:param key: Zobrist hash of the position or None to compute it.
+		:param time_limit: maximal time of the search in seconds, self.time_limit by default.
+		:param stop_event: threading.Event which stops this search when it is set or None
+		for a new event. The search waits until the previous search of the engine is over.
+		:return tuple (cell, value), where cell is row * size + column, value is None
+		if even the first iteration was not finished.
+		"""
+		with self.lock:
+			self.stop_event = stop_event if stop_event is not None else threading.Event()
+			return self.search_deepening(own, other, index, key, time_limit)
+
+	def search_deepening(self, own, other, index, key, time_limit):
+		"""Searches the position by iterative deepening, the lock of the engine is held."""
+		if key is None:
+			key = self.get_hash(own, other, index)
+
+		time_limit = time_limit if time_limit is not None else self.time_limit
+
+		self.nodes = 0
+		self.stopped = False
+		self.deadline = time.perf_counter() + time_limit if time_limit else None
+
+		n_empty = self.size * self.size - bin(own | other).count('1')
+
+		if n_empty <= self.solve_cells:
+			# Small positions are searched to the end of the game at once
+			depths = [n_empty]
+		else:
+			depths = range(1, min(self.max_depth, n_empty) + 1)
+
+		# Positions are evaluated only if the search does not reach the end of the game
+		self.use_evaluator = depths[0] < n_empty
+		if self.use_evaluator:
+			# Setting cells of the position to the evaluator
+			self.evaluator.reset()
+			for mask, mask_index in ((own, index), (other, 1 - index)):
+				while mask:
+					bit = mask & -mask
+					self.evaluator.add(bit.bit_length() - 1, mask_index)
+					mask ^= bit
+
+		moves = self.order_moves(own | other, self.get_table_move(key))
+		best_cell = moves[0]
+		best_value = None
+		# Depth of the last finished iteration
+		self.depth = 0
+
+		for depth in depths:
+			cell, value = self.search_root(own, other, index, key, depth, moves)
+
+			if cell is not None:
+				best_cell = cell
+				best_value = value
+				self.depth = depth
+
+			if self.stopped:
+				break
+
+			# The result of the game is known, deeper search does not change it.
+			# Only won and lost positions have values from WIN, heuristic values are lower.
+			if best_value is not None and abs(best_value) >= WIN:
+				break
+
+		return best_cell, best_value
+
+	def search_root(self, own, other, index, key, depth, moves):
+		"""
+		Searches steps of the root position to the given depth. Moves are sorted
+		by their values for the next iteration.
+		:param moves: list of empty cells, the best steps go first.
+		:return tuple (cell, value) or (None, None) if the search was stopped before
+		the first step was searched.
+		"""
+		alpha = -WIN * 2
+		beta = WIN * 2
+		best_cell = None
+		best_value = -math.inf
+		values = dict()
+
+		for cell in moves:
+			if self.use_evaluator:
+				self.evaluator.add(cell, index)
+
+			value = -self.negamax(
+				other, own | 1 << cell, cell, depth - 1, -beta, -alpha,
+				1 - index, self.get_child_hash(key, index, cell)
+			)
+
+			if self.use_evaluator:
+				self.evaluator.remove(cell, index)
+
+			# Values of steps searched after the budget is exhausted are not reliable
+			if self.stopped:
+				break
+
+			values[cell] = value
+			if value > best_value:
+				best_value = value
+				best_cell = cell
+			alpha = max(alpha, value)
+
+		# Searched steps go first in order of their values (stable sort keeps the rest)
+		moves.sort(key=lambda cell: -values.get(cell, -WIN * 3))
+
+		if best_cell is None:
+			return None, None
+
+		if not self.stopped:
+			self.table.put(key, (depth, best_value, EXACT, best_cell))
+
+		return best_cell, best_value
+
+	def stop(self):
+		"""Stops the current search, it may be called from another thread."""
+		self.stop_event.set()
+
+	def negamax(self, own, other, last_cell, depth, alpha, beta, index, key):
+		"""
+		Returns the value of the position for the player to move.
+		:param own: mask of cells of the player to move.
+		:param other: mask of cells of the player who did the last step to last_cell.
+		:param index: index of the player to move.
+		:param key: Zobrist hash of the position.
+		"""
+		self.nodes += 1
+		filled = own | other
+		n_empty = self.size * self.size - bin(filled).count('1')
+
+		# The last step won the game
+		for line in self.cell_lines[last_cell]:
+			if other & line == line:
+				return -(WIN + n_empty)
+
+		# Field filled
+		if filled == self.full_mask:
+			return 0
+
+		if depth <= 0 or self.is_out_of_budget():
+			return max(-MAX_HEURISTIC, min(MAX_HEURISTIC, self.evaluator.evaluate(index)))
+
+		# Looking for the position in the transposition table
+		table_move = None
+		entry = self.table.get(key)
+
+		if entry is not None:
+			entry_depth, entry_value, entry_flag, table_move = entry
+
+			if entry_depth >= depth:
+				if entry_flag == EXACT:
+					return entry_value
+				elif entry_flag == LOWER:
+					alpha = max(alpha, entry_value)
+				else:
+					beta = min(beta, entry_value)
+
+				if alpha >= beta:
+					return entry_value
+
+		alpha_start = alpha
+		best_value = -math.inf
+		best_cell = None
+
+		for cell in self.order_moves(filled, table_move):
+			if self.use_evaluator:
+				self.evaluator.add(cell, index)
+
+			value = -self.negamax(
+				other, own | 1 << cell, cell, depth - 1, -beta, -alpha,
+				1 - index, self.get_child_hash(key, index, cell)
+			)
+
+			if self.use_evaluator:
+				self.evaluator.remove(cell, index)
+
+			if value > best_value:
+				best_value = value
+				best_cell = cell
+
+			alpha = max(alpha, value)
+			if alpha >= beta:
+				break
+
+		# Values of the interrupted search are not saved
+		if not self.stopped:
+			if best_value <= alpha_start:
+				flag = UPPER
+			elif best_value >= beta:
+				flag = LOWER
+			else:
+				flag = EXACT
+			self.table.put(key, (depth, best_value, flag, best_cell))
+
+		return best_value
+
+	def order_moves(self, filled, first_cell=None):
+		"""Returns empty cells in order of searching."""
+		moves = [cell for cell in self.cell_order if not filled >> cell & 1]
+
+		# The best move of previous search goes first
+		if first_cell is not None and first_cell in moves:
+			moves.remove(first_cell)
+			moves.insert(0, first_cell)
+
+		return moves
+
+	def get_table_move(self, key):
+		"""Returns the best move of the position from the transposition table or None."""
+		entry = self.table.entries.get(key)
+		return entry[3] if entry is not None else None
+
+	def get_hash(self, own, other, index):
+		"""Returns Zobrist hash of the position."""
+		key = self.side_keys[index]
+
+		for mask, mask_index in ((own, index), (other, 1 - index)):
+			for cell in range(self.size * self.size):
+				if mask >> cell & 1:
+					key ^= self.cell_keys[mask_index][cell]
+
+		return key
+
+	def get_child_hash(self, key, index, cell):
+		"""Returns Zobrist hash of the position after step of player index to cell."""
+		return key ^ self.cell_keys[index][cell] ^ self.side_keys[index] ^ self.side_keys[1 - index]
+
+	def evaluate(self, own, other):
+		"""
+		Returns the heuristic value of the position for the player to move.
+		It scans all lines and is used to cross-check the evaluator.
+		"""
+		value = 0
+
+		for line in self.lines:
+			if not line & other:
+				value += self.line_values[bin(line & own).count('1')]
+			elif not line & own:
+				value -= self.line_values[bin(line & other).count('1')]
+
+		return max(-MAX_HEURISTIC, min(MAX_HEURISTIC, value))
+
+	def is_out_of_budget(self):
+		"""Returns True if the search must be stopped."""
+		if not self.stopped:
+			if self.stop_event.is_set():
+				self.stopped = True
+			elif self.max_nodes is not None and self.nodes >= self.max_nodes:
+				self.stopped = True
+			elif self.deadline is not None and time.perf_counter() >= self.deadline:
+				self.stopped = True
+
+		return self.stopped
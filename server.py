@@ -0,0 +1,374 @@
+"""
+Asyncio TCP server of tic tac toe games for many clients.
+
+Messages are JSON objects, one per line. Client messages:
+{"type": "create", "size": 3, "n_players": 2, "win_length": 3} creates a game
+and takes its first seat, the answer is {"type": "created", "game": id, "player": 0};
+{"type": "join", "game": id} takes the next free seat, the answer is
+{"type": "joined", "game": id, "player": index, "size": ..., "n_players": ...,
+"win_length": ..., "steps": [[row, column], ...]};
+{"type": "step", "game": id, "row": row, "column": column} does a step of the seat
+which moves now, one connection may take several seats;
+{"type": "leave", "game": id} closes the game.
+Server messages are sent to all players of the game: {"type": "start", "game": id}
+when all seats are taken, {"type": "step", "game": id, "player": index, "row": row,
+"column": column, "winner": winner} after each step (only the step, not the whole field;
+winner is the index of the player, -1 for draw or null) and {"type": "closed", "game": id}
+when the game is left. Errors are sent to the author of the message as
+{"type": "error", "game": id, "message": text}.
+Games are limited by MAX_SIZE, MAX_PLAYERS and MAX_LINE_COUNTERS, one connection may
+take seats in not more than MAX_CONNECTION_SESSIONS games.
+Run: python server.py --port 8765
+"""
+import argparse
+import asyncio
+import json
+
+from lines import get_lines
+from pool import FieldPool
+
+
+# Maximal size of the field of a game on the server
+MAX_SIZE = 50
+# Maximal number of players in a game
+MAX_PLAYERS = 10
+# Maximal number of line counters of a game (n_players * number of winning lines),
+# they take most of the memory of the field
+MAX_LINE_COUNTERS = 50_000
+# Maximal number of games on the server
+MAX_SESSIONS = 100_000
+# Maximal number of games of one connection
+MAX_CONNECTION_SESSIONS = 1000
+# Maximal number of fields of finished games kept for new games
+POOL_SIZE = 1000
+# Maximal total cost (cells and line counters) of fields kept for new games
+POOL_COST = 2_000_000
+# Maximal length of one message in bytes
+MAX_MESSAGE = 1 << 16
+
+
+def to_integer(value, name):
+	"""
+	Returns the value of the message field if it is an integer.
+	JSON numbers like 1.5 or 1e400 are not accepted, int() of infinity raises OverflowError.
+	"""
+	if type(value) is not int:
+		raise ValueError(f"Field {name} must be an integer. Wrong: {value!r}.")
+
+	return value
+
+
+class Session:
+	"""Represents a game on the server and connections of its players."""
+
+	def __init__(self, game_id, field):
+		"""
+		Initialization of basics parameters.
+		:param game_id: id of the game.
+		:param field: object of GameField class.
+		"""
+		self.id = game_id
+		self.field = field
+
+		# Connection of the player of each seat or None for free seats
+		self.seats = [None] * field.n_players
+
+	@property
+	def started(self):
+		"""Returns True if all seats are taken."""
+		return None not in self.seats
+
+	def get_connections(self):
+		"""Returns connections of the players without repetitions."""
+		return list(dict.fromkeys(seat for seat in self.seats if seat is not None))
+
+
+class Connection:
+	"""Represents a client connected to the server."""
+
+	def __init__(self, writer, pending):
+		"""
+		Initialization of basics parameters.
+		:param writer: asyncio.StreamWriter of the client.
+		:param pending: set of connections with unsent messages, the connection
+		adds itself to it.
+		"""
+		self.writer = writer
+		self.pending = pending
+		# Ids of games where the client takes seats
+		self.games = set()
+		# Unsent messages
+		self.output = list()
+
+	def send(self, message):
+		"""Puts the message to the output of the connection, it is sent by flush()."""
+		if not self.output:
+			self.pending.add(self)
+		self.output.append(json.dumps(message, separators=(',', ':')).encode())
+
+	def flush(self):
+		"""Writes all unsent messages to the socket at once."""
+		if not self.writer.is_closing():
+			self.output.append(b'')
+			self.writer.write(b'\n'.join(self.output))
+		self.output.clear()
+
+
+class GameServer:
+	"""Represents the server which manages games of the connected clients."""
+
+	def __init__(self, max_sessions=MAX_SESSIONS):
+		"""
+		Initialization of basics parameters.
+		:param max_sessions: maximal number of games on the server.
+		"""
+		self.max_sessions = max_sessions
+		self.sessions = dict()
+		# Fields of finished games are reused by new games
+		self.pool = FieldPool(max_size=POOL_SIZE, max_cost=POOL_COST)
+		self.next_id = 0
+
+		# Handlers of the client messages by their types
+		self.handlers = {
+			'create': self.create,
+			'join': self.join,
+			'step': self.step,
+			'leave': self.leave,
+		}
+
+		# Connections with unsent messages
+		self.pending = set()
+
+		# Statistics
+		self.n_steps = 0
+		self.n_games = 0
+
+	async def handle_connection(self, reader, writer):
+		"""
+		Reads messages of the client until it disconnects. All received messages are
+		handled at once and the answers to each client are written by one call.
+		"""
+		connection = Connection(writer, self.pending)
+		rest = b''
+
+		try:
+			while True:
+				data = await reader.read(MAX_MESSAGE)
+				if not data:
+					break
+
+				*lines, rest = (rest + data).split(b'\n')
+				if len(rest) > MAX_MESSAGE:
+					break
+
+				for line in lines:
+					self.handle_line(line, connection)
+
+				self.flush()
+				await writer.drain()
+		except ConnectionError:
+			pass
+		finally:
+			for game_id in list(connection.games):
+				self.close_session(self.sessions[game_id])
+
+			self.flush()
+			writer.close()
+
+	def flush(self):
+		"""Sends unsent messages of all connections."""
+		for connection in self.pending:
+			connection.flush()
+		self.pending.clear()
+
+	def handle_line(self, line, connection):
+		"""Handles one message of the client."""
+		try:
+			message = json.loads(line)
+			handler = self.handlers[message['type']]
+		except (ValueError, KeyError, TypeError):
+			connection.send({'type': 'error', 'game': None, 'message': "Wrong message."})
+			return
+
+		try:
+			handler(message, connection)
+		except (ValueError, KeyError, TypeError) as error:
+			connection.send({'type': 'error', 'game': message.get('game'), 'message': str(error)})
+
+	def get_session(self, message):
+		"""Returns the session of the game of the message."""
+		session = self.sessions.get(message['game'])
+		if session is None:
+			raise ValueError(f"Game {message['game']} does not exist.")
+
+		return session
+
+	def create(self, message, connection):
+		"""Creates the game and seats the client to its first seat."""
+		if len(self.sessions) >= self.max_sessions:
+			raise ValueError("Too many games on the server.")
+		self.check_connection_games(connection)
+
+		size = to_integer(message.get('size', 3), 'size')
+		if not 0 < size <= MAX_SIZE:
+			raise ValueError(
+				f"Size of field (size) must be greater than 0 and not greater than {MAX_SIZE}. "\
+				f"Wrong: 0 < {size} <= {MAX_SIZE}."
+			)
+
+		# The field creates a list of n_players symbols before validating it
+		n_players = to_integer(message.get('n_players', 2), 'n_players')
+		if not 1 < n_players <= min(size - 1, MAX_PLAYERS):
+			raise ValueError(
+				f"Number of players (n_players) must be greater than 1, less than size "\
+				f"of field (size) and not greater than {MAX_PLAYERS}. "\
+				f"Wrong: 1 < {n_players} <= {min(size - 1, MAX_PLAYERS)}."
+			)
+
+		win_length = to_integer(message.get('win_length') or size, 'win_length')
+		if not 1 < win_length <= size:
+			raise ValueError(
+				f"Length of winning line (win_length) must be greater than 1 and not greater "\
+				f"than size of field (size). Wrong: 1 < {win_length} <= {size}."
+			)
+
+		# Short lines on a large field give many lines, each player has a counter of each one
+		n_counters = n_players * len(get_lines(size, win_length)[0])
+		if n_counters > MAX_LINE_COUNTERS:
+			raise ValueError(
+				f"Game is too large: n_players * number of winning lines must not be greater "\
+				f"than {MAX_LINE_COUNTERS}. Wrong: {n_counters} <= {MAX_LINE_COUNTERS}."
+			)
+
+		field, _ = self.pool.acquire(size=size, n_players=n_players, win_length=win_length)
+
+		session = Session(self.next_id, field)
+		self.sessions[session.id] = session
+		self.next_id += 1
+		self.n_games += 1
+
+		session.seats[0] = connection
+		connection.games.add(session.id)
+		connection.send({'type': 'created', 'game': session.id, 'player': 0})
+
+	def join(self, message, connection):
+		"""Seats the client to the next free seat of the game."""
+		session = self.get_session(message)
+
+		if session.started:
+			raise ValueError(f"Game {session.id} has no free seats.")
+		if session.id not in connection.games:
+			self.check_connection_games(connection)
+
+		index = session.seats.index(None)
+		session.seats[index] = connection
+		connection.games.add(session.id)
+
+		field = session.field
+		connection.send({
+			'type': 'joined', 'game': session.id, 'player': index, 'size': field.size,
+			'n_players': field.n_players, 'win_length': field.win_length, 'steps': field.history,
+		})
+
+		if session.started:
+			for player in session.get_connections():
+				player.send({'type': 'start', 'game': session.id})
+
+	def check_connection_games(self, connection):
+		"""Raises ValueError if the client can not take seats in more games."""
+		if len(connection.games) >= MAX_CONNECTION_SESSIONS:
+			raise ValueError(
+				f"Too many games of the connection. "\
+				f"Wrong: {len(connection.games)} < {MAX_CONNECTION_SESSIONS}."
+			)
+
+	def step(self, message, connection):
+		"""Validates the step of the client and sends it to all players of the game."""
+		session = self.get_session(message)
+		field = session.field
+
+		if not session.started:
+			raise ValueError(f"Game {session.id} is not started.")
+
+		index = field.current_index
+		if session.seats[index] is not connection:
+			raise ValueError(f"It is not your turn, player {index} moves now.")
+
+		row = to_integer(message['row'], 'row')
+		column = to_integer(message['column'], 'column')
+		if not (0 <= row < field.size and 0 <= column < field.size):
+			raise ValueError(f"Cell ({row}, {column}) is out of the field.")
+
+		# Symbols of the players are their indices
+		winner = field.step(row, column)
+
+		self.n_steps += 1
+		delta = {
+			'type': 'step', 'game': session.id, 'player': index, 'row': row, 'column': column,
+			'winner': winner,
+		}
+		for player in session.get_connections():
+			player.send(delta)
+
+		# Finished games are removed from the server
+		if winner is not None:
+			self.remove_session(session)
+
+	def leave(self, message, connection):
+		"""Closes the game of the client."""
+		session = self.get_session(message)
+
+		if connection not in session.seats:
+			raise ValueError(f"You are not a player of game {session.id}.")
+
+		self.close_session(session)
+
+	def close_session(self, session):
+		"""Sends to the players that the game is closed and removes it."""
+		for player in session.get_connections():
+			player.send({'type': 'closed', 'game': session.id})
+
+		self.remove_session(session)
+
+	def remove_session(self, session):
+		"""Removes the game from the server and from the games of its players."""
+		for player in session.get_connections():
+			player.games.discard(session.id)
+
+		del self.sessions[session.id]
+		self.pool.release(session.field)
+
+	async def serve(self, host='127.0.0.1', port=8765, ready=None):
+		"""
+		Runs the server until it is cancelled.
+		:param ready: asyncio.Event or None, it is set when the server accepts connections.
+		"""
+		server = await asyncio.start_server(self.handle_connection, host, port)
+
+		if ready is not None:
+			ready.set()
+
+		async with server:
+			await server.serve_forever()
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Server of tic tac toe games.')
+	parser.add_argument('--host', default='127.0.0.1', help='address of the server')
+	parser.add_argument('--port', type=int, default=8765, help='port of the server')
+	parser.add_argument(
+		'--max-sessions', type=int, default=MAX_SESSIONS, help='maximal number of games'
+	)
+	args = parser.parse_args()
+
+	server = GameServer(max_sessions=args.max_sessions)
+	print(f"Serving on {args.host}:{args.port}")
+
+	try:
+		asyncio.run(server.serve(args.host, args.port))
+	except KeyboardInterrupt:
+		pass
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,245 @@
+"""
+Tablebase of perfect play for small fields (up to 4x4) and two players.
+
+Each position is indexed by its base-3 code: digit of cell (row * size + column)
+is 0 for an empty cell and (index + 1) for a cell of player with index index.
+Value of each position for the player to move takes 2 bits: UNKNOWN for
+unreachable positions, LOSS, DRAW or WIN. Positions are solved by retrograde
+analysis from the full field to the empty one, the positions with the same number
+of filled cells are solved in parallel.
+Build: python tablebase.py 4x4.tb --size 4 --workers 4
+"""
+import argparse
+import itertools
+import mmap
+import multiprocessing
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from lines import get_lines
+
+
+MAGIC = b'TTTTB\x01\x00\x00'
+HEADER = struct.Struct('<8sHH')
+
+# Values of positions for the player to move
+UNKNOWN = 0
+LOSS = 1
+DRAW = 2
+WIN = 3
+
+# Maximal number of cells of the field
+MAX_CELLS = 16
+
+
+def get_positions(n_cells, n_filled, occupied_cells):
+	"""
+	Returns codes of positions with n_filled cells where the first player has
+	one cell more or as many cells as the second player.
+	:param n_cells: number of cells of the field.
+	:param n_filled: number of filled cells.
+	:param occupied_cells: (n x n_filled) array of sets of filled cells.
+	"""
+	powers = 3 ** np.arange(n_cells, dtype=np.int64)
+
+	# Digits of the players for each choice of cells of the first player
+	choices = list(itertools.combinations(range(n_filled), (n_filled + 1) // 2))
+	digits = np.full((len(choices), n_filled), 2, dtype=np.int64)
+	for number, choice in enumerate(choices):
+		digits[number, list(choice)] = 1
+
+	return (powers[occupied_cells] @ digits.T).ravel()
+
+
+def solve_positions(task):
+	"""
+	Solves positions with n_filled cells using values of positions with more cells.
+	:param task: tuple (size, win_length, n_filled, occupied_cells, path of the table).
+	:return tuple (codes, values)
+	"""
+	size, win_length, n_filled, occupied_cells, table_path = task
+	n_cells = size * size
+
+	table = np.memmap(table_path, dtype=np.uint8, mode='r')
+	codes = get_positions(n_cells, n_filled, occupied_cells)
+
+	# Digits of the cells
+	digits = np.empty((len(codes), n_cells), dtype=np.int8)
+	rest = codes.copy()
+	for cell in range(n_cells):
+		rest, digits[:, cell] = np.divmod(rest, 3)
+
+	# Digit of the player to move and of the player who did the last step
+	mover = 1 if n_filled % 2 == 0 else 2
+	last = 3 - mover
+
+	lines = np.array(get_lines(size, win_length)[0])
+	line_digits = digits[:, lines]
+	last_won = (line_digits == last).all(axis=2).any(axis=1)
+	mover_won = (line_digits == mover).all(axis=2).any(axis=1)
+
+	values = np.full(len(codes), UNKNOWN, dtype=np.uint8)
+
+	# The best value of the steps: the loss of the opponent is the win of the player
+	if n_filled < n_cells:
+		best = np.zeros(len(codes), dtype=np.uint8)
+		power = 1
+		for cell in range(n_cells):
+			empty = digits[:, cell] == 0
+			child_values = table[codes[empty] + mover * power]
+			known = child_values != UNKNOWN
+			step_values = np.where(known, 4 - child_values.astype(np.int16), 0).astype(np.uint8)
+			best[empty] = np.maximum(best[empty], step_values)
+			power *= 3
+		values[:] = best
+	else:
+		values[:] = DRAW
+
+	values[last_won] = LOSS
+	# The game is over before this position
+	values[mover_won] = UNKNOWN
+
+	return codes, values
+
+
+def build_tablebase(path, size=4, win_length=None, n_workers=1, chunk_size=1000):
+	"""
+	Solves all positions of the field and saves the tablebase.
+	:param path: path to the tablebase file.
+	:param size: size of game field.
+	:param win_length: number of cells in the winning line (size by default).
+	:param n_workers: number of processes.
+	:param chunk_size: number of sets of filled cells solved by one task.
+	"""
+	win_length = win_length or size
+	n_cells = size * size
+
+	if n_cells > MAX_CELLS:
+		raise ValueError(
+			f"Tablebase can be built for fields with not more than {MAX_CELLS} cells. "\
+			f"Wrong: {n_cells} <= {MAX_CELLS}."
+		)
+
+	n_positions = 3 ** n_cells
+	pool = multiprocessing.Pool(n_workers) if n_workers > 1 else None
+
+	# Values of all positions, one byte per position while solving
+	table_file = tempfile.NamedTemporaryFile(suffix='.values', delete=False)
+	table_file.close()
+
+	try:
+		table = np.memmap(table_file.name, dtype=np.uint8, mode='w+', shape=(n_positions, ))
+
+		for n_filled in range(n_cells, -1, -1):
+			combinations = list(itertools.combinations(range(n_cells), n_filled))
+			occupied_cells = np.array(combinations, dtype=np.int64).reshape(len(combinations), n_filled)
+
+			tasks = [
+				(size, win_length, n_filled, occupied_cells[start:start + chunk_size], table_file.name)
+				for start in range(0, len(occupied_cells), chunk_size)
+			]
+
+			# Positions with more cells must be visible to the workers
+			table.flush()
+			results = pool.imap_unordered(solve_positions, tasks) if pool else map(solve_positions, tasks)
+
+			for codes, values in results:
+				table[codes] = values
+
+		# Packing 4 values to one byte
+		padded = np.zeros(-(-n_positions // 4) * 4, dtype=np.uint8)
+		padded[:n_positions] = table
+		padded = padded.reshape(-1, 4)
+		packed = padded[:, 0] | padded[:, 1] << 2 | padded[:, 2] << 4 | padded[:, 3] << 6
+
+		with open(path, 'wb') as file:
+			file.write(HEADER.pack(MAGIC, size, win_length))
+			file.write(packed.tobytes())
+
+		del table
+	finally:
+		if pool is not None:
+			pool.close()
+		os.remove(table_file.name)
+
+
+class Tablebase:
+	"""Represents the tablebase opened with mmap."""
+
+	def __init__(self, path):
+		"""
+		Opens the tablebase.
+		:param path: path to the tablebase file.
+		"""
+		with open(path, 'rb') as file:
+			self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+		magic, self.size, self.win_length = HEADER.unpack_from(self.mmap)
+		if magic != MAGIC:
+			raise ValueError(f"File {path} is not a tablebase.")
+
+		self.powers = [3 ** cell for cell in range(self.size * self.size)]
+
+	def close(self):
+		"""Closes the tablebase."""
+		self.mmap.close()
+
+	def is_suitable(self, field):
+		"""Returns True if the tablebase contains positions of the field."""
+		return (field.size, field.n_players, field.win_length) == (self.size, 2, self.win_length)
+
+	def get_code(self, field):
+		"""Returns the code of the position of the field."""
+		code = 0
+
+		# Players do steps in order of their indices
+		for number, (row, column) in enumerate(field.history):
+			code += (number % 2 + 1) * self.powers[row * field.size + column]
+
+		return code
+
+	def get_value(self, code):
+		"""Returns the value of the position with the code for the player to move."""
+		byte = self.mmap[HEADER.size + (code >> 2)]
+		return byte >> ((code & 3) * 2) & 3
+
+	def get_best_step(self, field):
+		"""
+		Returns the best step (row, column) of the player to move and its value
+		or None if the position is unknown.
+		"""
+		code = self.get_code(field)
+		if self.get_value(code) == UNKNOWN:
+			return None
+
+		digit = field.current_index + 1
+		best_step = None
+		best_value = UNKNOWN
+
+		for cell in field.free_cells:
+			value = self.get_value(code + digit * self.powers[cell])
+			if value != UNKNOWN and 4 - value > best_value:
+				best_value = 4 - value
+				best_step = divmod(cell, field.size)
+
+		return best_step, best_value
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Builds the tablebase of perfect play.')
+	parser.add_argument('output', help='tablebase file')
+	parser.add_argument('--size', type=int, default=4, help='size of game field')
+	parser.add_argument(
+		'--win-length', type=int, help='number of cells in the winning line (size by default)'
+	)
+	parser.add_argument('--workers', type=int, default=1, help='number of processes')
+	args = parser.parse_args()
+
+	build_tablebase(args.output, size=args.size, win_length=args.win_length, n_workers=args.workers)
+
+
+if __name__ == '__main__':
+	main()
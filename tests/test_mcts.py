@@ -0,0 +1,19 @@
+import pytest
+
+from game import GameField
+from mcts import MCTSPlayer
+
+
+@pytest.mark.parametrize('limits', [
+	{'time_limit': 0},
+	{'time_limit': 1e-9},
+	{'max_playouts': 0, 'time_limit': None},
+])
+def test_step_without_finished_playouts(limits):
+	field = GameField(5, win_length=4)
+	bot = MCTSPlayer(field, seed=0, **limits)
+
+	row, column = bot.step()
+
+	assert field.is_free(row, column)
+	assert bot.n_playouts == 1
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+
+from bitboard import BitboardGameField
+from game import AIPlayer, GameField
+
+
+# Time of the search after the deadline: setting cells to the evaluator, the last node
+DEADLINE_MARGIN = 0.02
+
+
+def play_opening(field, steps):
+	"""Does the steps on the field."""
+	for row, column in steps:
+		field.step(row, column)
+
+
+@pytest.mark.parametrize('field_class', [GameField, BitboardGameField])
+@pytest.mark.parametrize('size', [15, 19])
+def test_step_meets_deadline(field_class, size):
+	field = field_class(size, win_length=5)
+	center = size // 2
+	play_opening(field, [(center, center), (center, center + 1), (center + 1, center + 1)])
+
+	bot = AIPlayer(field, max_depth=10)
+	time_limit = 0.05
+
+	for _ in range(3):
+		start = time.perf_counter()
+		row, column = bot.step(time_limit=time_limit)
+		elapsed = time.perf_counter() - start
+
+		assert elapsed < time_limit + DEADLINE_MARGIN
+		assert field.is_free(row, column)
+		field.step(row, column)
+
+
+def test_long_lines_do_not_look_like_wins():
+	# Heuristic values of lines of 8 cells are larger than WIN without the limit
+	field = GameField(10)
+	first = [(row, column) for row in (0, 2, 4) for column in range(8)]
+	second = [(row, column) for row in (5, 6, 7, 8) for column in range(row % 2, 10, 2)]
+	second = second[:20] + [(9, 1), (9, 3), (9, 5)]
+	for step in range(len(second)):
+		field.step(*first[step])
+		field.step(*second[step])
+	field.step(*first[-1])
+
+	bot = AIPlayer(field, max_depth=3, max_nodes=5000)
+	row, column = bot.step()
+
+	assert field.is_free(row, column)
+	# The search is not stopped at depth 1 as if the game was decided
+	assert bot.engine.depth > 1
+
+
+def get_outcomes(field, bot, bot_index):
+	"""
+	Plays all games where the bot plays for bot_index and the opponent tries every step.
+	:return set of winners of the games
+	"""
+	if field.current_index == bot_index:
+		steps = [bot.step()]
+	else:
+		steps = field.get_free_cells()
+
+	winners = set()
+	for row, column in steps:
+		winner = field.step(row, column)
+		if winner is None:
+			winners |= get_outcomes(field, bot, bot_index)
+		else:
+			winners.add(winner)
+		field.undo()
+
+	return winners
+
+
+@pytest.mark.parametrize('bot_index', [0, 1])
+def test_bot_never_loses_on_3x3(bot_index):
+	field = GameField(3)
+	bot = AIPlayer(field)
+
+	winners = get_outcomes(field, bot, bot_index)
+
+	assert winners <= {bot_index, -1}
+
+
+def test_stop_ends_search_early():
+	field = GameField(15, win_length=5)
+	play_opening(field, [(7, 7), (7, 8)])
+	bot = AIPlayer(field, max_depth=10, time_limit=10)
+
+	results = list()
+	thread = threading.Thread(target=lambda: results.append(bot.step()))
+	start = time.perf_counter()
+	thread.start()
+
+	time.sleep(0.1)
+	bot.stop()
+	thread.join(timeout=5)
+	elapsed = time.perf_counter() - start
+
+	assert not thread.is_alive()
+	assert elapsed < 1
+	assert field.is_free(*results[0])
+
+
+def test_stop_event_set_before_search():
+	field = GameField(15, win_length=5)
+	bot = AIPlayer(field, max_depth=10, time_limit=10)
+
+	stop_event = threading.Event()
+	stop_event.set()
+
+	start = time.perf_counter()
+	row, column = bot.step(stop_event=stop_event)
+
+	assert time.perf_counter() - start < 1
+	assert field.is_free(row, column)
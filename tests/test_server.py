@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from server import Connection, GameServer
+
+
+def send(server, connection, message):
+	"""Handles the message of the client and returns the answers to him."""
+	server.handle_line(json.dumps(message) if isinstance(message, dict) else message, connection)
+
+	answers = [json.loads(line) for line in connection.output]
+	connection.output.clear()
+	return answers
+
+
+@pytest.fixture
+def game():
+	"""Returns the server and the connection which takes both seats of game 0."""
+	server = GameServer()
+	connection = Connection(None, server.pending)
+	send(server, connection, {'type': 'create', 'size': 3})
+	send(server, connection, {'type': 'join', 'game': 0})
+	return server, connection
+
+
+@pytest.mark.parametrize('line', [
+	'{"type": "step", "game": 0, "row": 1e400, "column": 0}',
+	'{"type": "step", "game": 0, "row": 1.5, "column": 0}',
+	'{"type": "step", "game": 0, "row": "1", "column": 0}',
+	'{"type": "step", "game": 0, "row": true, "column": 0}',
+	'{"type": "create", "size": 1e400}',
+	'{"type": "create", "size": 5, "n_players": 1000000000}',
+	'{"type": "create", "size": 5, "win_length": 2.5}',
+])
+def test_wrong_numbers_are_errors(game, line):
+	server, connection = game
+
+	answers = send(server, connection, line)
+
+	assert [answer['type'] for answer in answers] == ['error']
+	# The game is still playable
+	answers = send(server, connection, {'type': 'step', 'game': 0, 'row': 1, 'column': 1})
+	assert answers[0]['type'] == 'step'
+
+
+@pytest.mark.parametrize('message', [
+	{'type': 'create', 'size': 50, 'n_players': 49, 'win_length': 2},
+	{'type': 'create', 'size': 50, 'n_players': 11},
+	{'type': 'create', 'size': 50, 'n_players': 10, 'win_length': 2},
+	{'type': 'create', 'size': 5, 'win_length': 6},
+])
+def test_large_games_are_refused(message):
+	server = GameServer()
+	connection = Connection(None, server.pending)
+
+	answers = send(server, connection, message)
+
+	assert [answer['type'] for answer in answers] == ['error']
+	assert not server.sessions
+
+
+def test_games_of_connection_are_limited(monkeypatch):
+	monkeypatch.setattr('server.MAX_CONNECTION_SESSIONS', 3)
+	server = GameServer()
+	connection = Connection(None, server.pending)
+
+	answers = [send(server, connection, {'type': 'create'})[0] for _ in range(4)]
+
+	assert [answer['type'] for answer in answers] == ['created'] * 3 + ['error']
+	# Other clients still can create games
+	other = Connection(None, server.pending)
+	assert send(server, other, {'type': 'create'})[0]['type'] == 'created'
+
+
+def test_pool_is_bounded_by_cost():
+	server = GameServer()
+	server.pool.max_cost = server.pool.get_cost(server.pool.acquire(size=20, win_length=5)[0])
+
+	connection = Connection(None, server.pending)
+	for game_id in range(2):
+		send(server, connection, {'type': 'create', 'size': 20, 'win_length': 5})
+	for game_id in range(2):
+		send(server, connection, {'type': 'leave', 'game': game_id})
+
+	assert len(server.pool) == 1
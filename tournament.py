@@ -0,0 +1,269 @@
+"""
+Plays games between bots and prints the table of results.
+Run: python tournament.py random ai ai:max_depth=2 --size 4 --games 50 --workers 4
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import random
+import time
+
+from game import AIPlayer, RandomPlayer
+from mcts import MCTSPlayer
+from pool import FieldPool
+from records import RecordWriter
+
+
+# Fields of played games with their bots, they are reused by next games of the process
+_field_pool = FieldPool()
+
+# Classes of bots by their names
+PLAYER_CLASSES = {
+	'random': RandomPlayer,
+	'ai': AIPlayer,
+	'mcts': MCTSPlayer,
+}
+
+
+def parse_player(spec):
+	"""
+	Parses the bot specification 'name' or 'name:param=value,param=value'.
+	:return tuple (class, dict of parameters)
+	"""
+	name, _, params = spec.partition(':')
+
+	if name not in PLAYER_CLASSES:
+		raise ValueError(
+			f"Unknown player: {name}. Known players: {', '.join(PLAYER_CLASSES)}."
+		)
+
+	kwargs = dict()
+	for param in filter(None, params.split(',')):
+		key, _, value = param.partition('=')
+		kwargs[key] = json.loads(value)
+
+	return PLAYER_CLASSES[name], kwargs
+
+
+def create_player(spec, field, seed):
+	"""Creates the bot by its specification."""
+	player_class, kwargs = parse_player(spec)
+
+	if player_class is not AIPlayer:
+		kwargs.setdefault('seed', seed)
+
+	return player_class(field, **kwargs)
+
+
+def close_players(players):
+	"""Closes the bots which have process pools."""
+	for player in players:
+		if hasattr(player, 'close'):
+			player.close()
+
+
+def get_schedule(n_participants, n_players, n_rounds):
+	"""
+	Returns the list of games. Each round contains games with all seatings
+	of the participants.
+	:return list of tuples of indices of participants in order of their steps
+	"""
+	seatings = list(itertools.permutations(range(n_participants), n_players))
+	return [seating for _ in range(n_rounds) for seating in seatings]
+
+
+def play_game(task):
+	"""
+	Plays one game.
+	:param task: tuple (game index, seating, specs, size, n_players, win_length, seed,
+	random_openings).
+	:return tuple (game index, seating, index of winner in seating or -1, number of steps,
+	list of cells of steps)
+	"""
+	index, seating, specs, size, n_players, win_length, seed, random_openings = task
+
+	# Seed of the game depends only on seed of the tournament and index of the game
+	rng = random.Random(f'{seed}:{index}')
+
+	# Bots are kept with the field for the next games with the same seating
+	seating_specs = tuple(specs[participant] for participant in seating)
+	field, players = _field_pool.acquire(
+		size=size, n_players=n_players, win_length=win_length, tag=seating_specs
+	)
+
+	if players is None:
+		players = [create_player(spec, field, rng.getrandbits(32)) for spec in seating_specs]
+	else:
+		for player in players:
+			player.reset(rng.getrandbits(32))
+
+	try:
+		while field.winner is None:
+			if len(field.history) < random_openings:
+				row, column = field.get_random_free_cell(rng)
+			else:
+				row, column = players[field.current_index].step()
+			field.step(row, column)
+	except BaseException:
+		close_players(players)
+		raise
+
+	steps = [row * size + column for row, column in field.history]
+	winner = field.winner
+
+	if not _field_pool.release(field, players, tag=seating_specs):
+		close_players(players)
+
+	return index, seating, winner, len(steps), steps
+
+
+def run_tournament(
+		specs, size=3, n_players=2, win_length=None, n_rounds=10, seed=0, random_openings=0,
+		n_workers=1, shard=0, n_shards=1, record_path=None
+	):
+	"""
+	Plays the tournament. Games are shared between shards by their indices,
+	so results of all shards together do not depend on the number of shards.
+	:param record_path: path to the file of game records or None.
+	:return list of results of play_game() without steps
+	"""
+	schedule = get_schedule(len(specs), n_players, n_rounds)
+
+	tasks = [
+		(index, seating, specs, size, n_players, win_length, seed, random_openings)
+		for index, seating in enumerate(schedule) if index % n_shards == shard
+	]
+
+	pool = multiprocessing.Pool(n_workers) if n_workers > 1 else None
+	writer = RecordWriter(record_path) if record_path else None
+	results = list()
+
+	try:
+		if pool is None:
+			games = map(play_game, tasks)
+		else:
+			games = pool.imap_unordered(play_game, tasks, chunksize=4)
+
+		for index, seating, winner, n_steps, steps in games:
+			results.append((index, seating, winner, n_steps))
+
+			if writer is not None:
+				writer.write_game(size, n_players, steps, winner, win_length=win_length)
+	finally:
+		if pool is not None:
+			pool.close()
+		if writer is not None:
+			writer.close()
+
+	return sorted(results)
+
+
+def get_table(specs, results):
+	"""
+	Counts wins, draws and losses of each participant.
+	:return list of dicts with keys player, games, wins, draws, losses
+	"""
+	table = [
+		{'player': spec, 'games': 0, 'wins': 0, 'draws': 0, 'losses': 0}
+		for spec in specs
+	]
+
+	for _, seating, winner, _ in results:
+		for seat, participant in enumerate(seating):
+			row = table[participant]
+			row['games'] += 1
+
+			if winner == -1:
+				row['draws'] += 1
+			elif winner == seat:
+				row['wins'] += 1
+			else:
+				row['losses'] += 1
+
+	return table
+
+
+def print_table(table):
+	"""Prints the table of results."""
+	width = max(len(row['player']) for row in table) + 2
+	print(f"{'player':<{width}}{'games':>8}{'wins':>8}{'draws':>8}{'losses':>8}")
+
+	for row in table:
+		print(
+			f"{row['player']:<{width}}{row['games']:>8}{row['wins']:>8}"
+			f"{row['draws']:>8}{row['losses']:>8}"
+		)
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Tournament between tic tac toe bots.')
+	parser.add_argument(
+		'players', nargs='+',
+		help=f"bots: {', '.join(PLAYER_CLASSES)}, parameters as 'ai:max_depth=2,max_nodes=1000'"
+	)
+	parser.add_argument('--size', type=int, default=3, help='size of game field')
+	parser.add_argument('--n-players', type=int, default=2, help='number of players in a game')
+	parser.add_argument(
+		'--win-length', type=int, help='number of cells in the winning line (size by default)'
+	)
+	parser.add_argument('--rounds', type=int, default=10, help='number of games of each seating')
+	parser.add_argument('--seed', type=int, default=0, help='seed of the tournament')
+	parser.add_argument(
+		'--random-openings', type=int, default=0, help='number of random steps in each game'
+	)
+	parser.add_argument('--workers', type=int, default=1, help='number of processes')
+	parser.add_argument(
+		'--shard', default='0/1', help='part K/M of games played on this machine'
+	)
+	parser.add_argument('--output', help='JSON file for results')
+	parser.add_argument('--record', help='file for appending records of the games')
+	parser.add_argument(
+		'--merge', nargs='+', metavar='FILE',
+		help='print the table of results of shards from JSON files and exit'
+	)
+	args = parser.parse_args()
+
+	if args.merge:
+		results = list()
+		for path in args.merge:
+			with open(path) as file:
+				results.extend(tuple(result) for result in json.load(file)['results'])
+		print_table(get_table(args.players, sorted(results)))
+		return
+
+	for spec in args.players:
+		parse_player(spec)
+
+	shard, n_shards = map(int, args.shard.split('/'))
+
+	start = time.perf_counter()
+	results = run_tournament(
+		args.players, size=args.size, n_players=args.n_players, win_length=args.win_length,
+		n_rounds=args.rounds,
+		seed=args.seed, random_openings=args.random_openings, n_workers=args.workers,
+		shard=shard, n_shards=n_shards, record_path=args.record
+	)
+	elapsed = time.perf_counter() - start
+
+	table = get_table(args.players, results)
+	print_table(table)
+
+	n_steps = sum(result[3] for result in results)
+	print(
+		f"\n{len(results)} games, {n_steps} steps in {elapsed:.2f} s: "
+		f"{len(results) / elapsed:.1f} games/sec, {n_steps / elapsed:.0f} steps/sec"
+	)
+
+	if args.output:
+		with open(args.output, 'w') as file:
+			json.dump({
+				'players': args.players, 'size': args.size, 'n_players': args.n_players,
+				'win_length': args.win_length,
+				'seed': args.seed, 'shard': args.shard, 'table': table,
+				'results': [list(result) for result in results],
+			}, file)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,315 @@
+"""
+Value function of positions learned from self-play.
+
+Features of a position are computed for the player who did the last step: for each
+number of cells c (1 ... win_length - 1) the share of winning lines with c cells of
+the player and without other cells, and the same for lines of his opponent.
+The model (logistic regression or MLP with one hidden layer) predicts the
+probability that the player wins. Games are played in batches by BatchGameField
+with steps of choose_moves() and random steps, the model is fitted with NumPy.
+Train: python value.py value.npz --size 15 --win-length 5 --games 2000 --hidden 16
+"""
+import argparse
+
+import numpy as np
+
+from batch import BatchGameField, choose_moves, get_line_arrays
+
+
+def get_features(boards, players, win_length=None):
+	"""
+	Returns features of the positions for the given players.
+	:param boards: (n_boards x size x size) integer matrix, 0 is an empty cell and
+	(index + 1) is a cell of player with index index (2 players).
+	:param players: array of indices of the players for each position.
+	:param win_length: number of cells in the winning line (size by default).
+	:return (n_boards x 2 * (win_length - 1)) float matrix
+	"""
+	n_boards, size, _ = boards.shape
+	win_length = win_length or size
+	lines, _ = get_line_arrays(size, win_length)
+
+	cells = boards.reshape(n_boards, -1)[:, lines[:-1]]
+	own = (cells == (np.asarray(players) + 1)[:, None, None]).sum(axis=2)
+	other = (cells != 0).sum(axis=2) - own
+
+	return get_line_features(own, other, win_length)
+
+
+def get_line_features(own, other, win_length):
+	"""
+	Returns features by numbers of cells of the player and of his opponent in every line.
+	:param own: (n x n_lines) matrix of numbers of cells of the player.
+	:param other: (n x n_lines) matrix of numbers of cells of his opponent.
+	"""
+	n_lines = own.shape[1]
+	counts = np.arange(1, win_length)
+
+	own_features = ((own[:, :, None] == counts) & (other == 0)[:, :, None]).sum(axis=1)
+	other_features = ((other[:, :, None] == counts) & (own == 0)[:, :, None]).sum(axis=1)
+
+	return np.concatenate([own_features, other_features], axis=1) / n_lines
+
+
+class ValueFunction:
+	"""Represents the model which predicts the probability of win by features of the position."""
+
+	def __init__(self, win_length, hidden=0, seed=None):
+		"""
+		Initialization of basics parameters.
+		:param win_length: number of cells in the winning line.
+		:param hidden: number of neurons of the hidden layer, 0 for logistic regression.
+		:param seed: seed of initial weights.
+		"""
+		self.win_length = win_length
+		self.hidden = hidden
+		n_features = 2 * (win_length - 1)
+
+		rng = np.random.default_rng(seed)
+
+		# Standardization of the features
+		self.mean = np.zeros(n_features, dtype=np.float32)
+		self.std = np.ones(n_features, dtype=np.float32)
+
+		if hidden:
+			self.weights = [
+				(rng.standard_normal((n_features, hidden)) / np.sqrt(n_features)).astype(np.float32),
+				np.zeros(hidden, dtype=np.float32),
+				(rng.standard_normal(hidden) / np.sqrt(hidden)).astype(np.float32),
+				np.zeros(1, dtype=np.float32),
+			]
+		else:
+			self.weights = [np.zeros(n_features, dtype=np.float32), np.zeros(1, dtype=np.float32)]
+
+		# Lines of the fields by size
+		self.lines = dict()
+
+	@classmethod
+	def load(cls, path):
+		"""Loads the model saved by save()."""
+		with np.load(path) as data:
+			model = cls(int(data['win_length']), int(data['hidden']))
+			model.mean = data['mean']
+			model.std = data['std']
+			model.weights = [data[f'weights_{number}'] for number in range(len(model.weights))]
+
+		return model
+
+	def save(self, path):
+		"""Saves the weights to NumPy .npz file."""
+		np.savez_compressed(
+			path, win_length=self.win_length, hidden=self.hidden, mean=self.mean, std=self.std,
+			**{f'weights_{number}': weights for number, weights in enumerate(self.weights)}
+		)
+
+	def forward(self, features):
+		"""
+		Returns logits of the positions and the hidden layer (or None).
+		:param features: (n x n_features) matrix.
+		"""
+		inputs = (features - self.mean) / self.std
+
+		if not self.hidden:
+			weights, bias = self.weights
+			return inputs @ weights + bias, None
+
+		weights_1, bias_1, weights_2, bias_2 = self.weights
+		hidden = np.tanh(inputs @ weights_1 + bias_1)
+		return hidden @ weights_2 + bias_2, hidden
+
+	def predict(self, features):
+		"""Returns probabilities of win of the player for each row of features."""
+		logits, _ = self.forward(features)
+		return 1 / (1 + np.exp(-logits))
+
+	def fit(self, features, targets, epochs=300, learning_rate=0.05, l2=1e-4):
+		"""
+		Fits the model by full-batch gradient descent with Adam minimizing cross-entropy.
+		:param features: (n x n_features) matrix.
+		:param targets: array of results of the player: 1 for win, 0.5 for draw, 0 for loss.
+		:return the loss of the last epoch
+		"""
+		features = features.astype(np.float32)
+		targets = targets.astype(np.float32)
+
+		self.mean = features.mean(axis=0)
+		self.std = features.std(axis=0) + 1e-6
+		inputs = (features - self.mean) / self.std
+
+		moments = [np.zeros_like(weights) for weights in self.weights]
+		velocities = [np.zeros_like(weights) for weights in self.weights]
+		loss = None
+
+		for epoch in range(1, epochs + 1):
+			logits, hidden = self.forward(features)
+			probabilities = 1 / (1 + np.exp(-logits))
+			loss = -np.mean(
+				targets * np.log(probabilities + 1e-7) + (1 - targets) * np.log(1 - probabilities + 1e-7)
+			)
+
+			# Gradient of the cross-entropy by the logits
+			error = (probabilities - targets) / len(targets)
+
+			if not self.hidden:
+				gradients = [inputs.T @ error, np.array([error.sum()])]
+			else:
+				weights_2 = self.weights[2]
+				hidden_error = np.outer(error, weights_2) * (1 - hidden ** 2)
+				gradients = [
+					inputs.T @ hidden_error, hidden_error.sum(axis=0),
+					hidden.T @ error, np.array([error.sum()]),
+				]
+
+			for number, gradient in enumerate(gradients):
+				gradient = gradient + l2 * self.weights[number]
+				moments[number] = 0.9 * moments[number] + 0.1 * gradient
+				velocities[number] = 0.999 * velocities[number] + 0.001 * gradient ** 2
+				step = learning_rate * (moments[number] / (1 - 0.9 ** epoch)) / (
+					np.sqrt(velocities[number] / (1 - 0.999 ** epoch)) + 1e-8
+				)
+				self.weights[number] = (self.weights[number] - step).astype(np.float32)
+
+		return float(loss)
+
+	def is_suitable(self, field):
+		"""Returns True if the model can evaluate positions of the field."""
+		return field.n_players == 2 and field.win_length == self.win_length
+
+	def get_lines(self, size):
+		"""Returns lines and lines of each cell of the field of the given size."""
+		if size not in self.lines:
+			self.lines[size] = get_line_arrays(size, self.win_length)
+
+		return self.lines[size]
+
+	def get_best_step(self, field):
+		"""
+		Returns the step (row, column) of the player to move with the best value.
+		Features of positions after all steps are computed at once from the features
+		of the current position and changes of the lines through each empty cell.
+		:param field: object of GameField class with 2 players.
+		"""
+		size = field.size
+		lines, cell_lines = self.get_lines(size)
+		n_lines = len(lines) - 1
+
+		# Players do steps in order of their indices
+		board = np.zeros(size * size, dtype=np.int8)
+		for number, (row, column) in enumerate(field.history):
+			board[row * size + column] = number % 2 + 1
+
+		cells = board[lines[:-1]]
+		own = (cells == field.current_index + 1).sum(axis=1)
+		other = (cells != 0).sum(axis=1) - own
+
+		# The padding line is full of cells of both players, so it never changes features
+		own = np.append(own, self.win_length)
+		other = np.append(other, self.win_length)
+
+		empty = np.flatnonzero(board == 0)
+		own_counts = own[cell_lines[empty]]
+		other_counts = other[cell_lines[empty]]
+
+		# The step wins if it completes a line
+		wins = ((own_counts == self.win_length - 1) & (other_counts == 0)).any(axis=1)
+		if wins.any():
+			return divmod(int(empty[wins.argmax()]), size)
+
+		n_features = 2 * (self.win_length - 1)
+		# Offsets of rows of the candidate steps in the flattened matrix of changes
+		offsets = np.arange(len(empty))[:, None] * (n_features + 1)
+
+		# Lines of the player get one more cell, lines of the opponent become blocked
+		grown = other_counts == 0
+		added = np.where(grown, own_counts, n_features)
+		removed = np.where(
+			grown & (own_counts > 0), own_counts - 1,
+			np.where((own_counts == 0) & (other_counts > 0), self.win_length - 2 + other_counts, n_features)
+		)
+		changes = np.bincount((offsets + added).ravel(), minlength=len(empty) * (n_features + 1)) - \
+			np.bincount((offsets + removed).ravel(), minlength=len(empty) * (n_features + 1))
+		changes = changes.reshape(len(empty), n_features + 1)
+
+		features = get_line_features(own[None, :-1], other[None, :-1], self.win_length) + \
+			changes[:, :n_features] / n_lines
+
+		values = self.predict(features)
+		return divmod(int(empty[values.argmax()]), size)
+
+
+def play_games(n_games, size, win_length=None, epsilon=0.2, seed=None):
+	"""
+	Plays games in batch by choose_moves() with random steps with probability epsilon.
+	:return tuple (features, targets) of positions after each step for the player who did it
+	"""
+	rng = np.random.default_rng(seed)
+	games = BatchGameField(n_games, size=size, n_players=2, win_length=win_length)
+
+	all_features = list()
+	all_games = list()
+	all_players = list()
+
+	while games.active.any():
+		active = np.flatnonzero(games.active)
+		players = games.current_players[active].copy()
+
+		cells = choose_moves(games.boards, 2, games.win_length)
+		random_rows, random_columns = games.random_moves(rng)
+		greedy = rng.random(n_games) >= epsilon
+		games.step(
+			np.where(greedy, cells // size, random_rows), np.where(greedy, cells % size, random_columns)
+		)
+
+		all_features.append(get_features(games.boards[active], players, games.win_length))
+		all_games.append(active)
+		all_players.append(players)
+
+	game_indices = np.concatenate(all_games)
+	players = np.concatenate(all_players)
+	winners = games.winners[game_indices]
+
+	targets = np.where(winners == players, 1.0, np.where(winners < 0, 0.5, 0.0))
+	return np.concatenate(all_features), targets
+
+
+def train_value_function(
+		size, win_length=None, n_games=1000, hidden=0, epochs=300, epsilon=0.2, seed=None
+	):
+	"""
+	Plays games and fits the value function.
+	:return tuple (ValueFunction, loss)
+	"""
+	win_length = win_length or size
+	features, targets = play_games(n_games, size, win_length, epsilon, seed)
+
+	model = ValueFunction(win_length, hidden, seed)
+	loss = model.fit(features, targets, epochs=epochs)
+
+	return model, loss
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Trains the value function by self-play.')
+	parser.add_argument('output', help='file of weights (.npz)')
+	parser.add_argument('--size', type=int, default=15, help='size of game field')
+	parser.add_argument(
+		'--win-length', type=int, help='number of cells in the winning line (size by default)'
+	)
+	parser.add_argument('--games', type=int, default=1000, help='number of self-play games')
+	parser.add_argument(
+		'--hidden', type=int, default=0, help='neurons of the hidden layer, 0 for linear model'
+	)
+	parser.add_argument('--epochs', type=int, default=300, help='number of training epochs')
+	parser.add_argument('--epsilon', type=float, default=0.2, help='probability of random step')
+	parser.add_argument('--seed', type=int, default=0, help='seed of games and weights')
+	args = parser.parse_args()
+
+	model, loss = train_value_function(
+		args.size, args.win_length, args.games, args.hidden, args.epochs, args.epsilon, args.seed
+	)
+	model.save(args.output)
+	print(f"loss: {loss:.4f}, weights saved to {args.output}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,95 @@
+import random
+
+
+# Cache of Zobrist keys for every size of the field and number of players
+_keys_cache = dict()
+# Cache of symmetries for every size of the field
+_symmetries_cache = dict()
+
+
+def get_zobrist_keys(size, n_players):
+	"""
+	Returns random 64-bit keys for Zobrist hashing of the field.
+	Keys are generated with fixed seed, so hashes are the same in all processes.
+	:param size: size of game field.
+	:param n_players: number of players.
+	:return tuple (cell_keys, side_keys), where cell_keys[index][cell] is a key of cell
+	(row * size + column) of player with index index and side_keys[index] is a key
+	of the player to move.
+	"""
+	if (size, n_players) not in _keys_cache:
+		rng = random.Random(f'{size}:{n_players}')
+
+		cell_keys = [
+			[rng.getrandbits(64) for _ in range(size * size)]
+			for _ in range(n_players)
+		]
+		side_keys = [rng.getrandbits(64) for _ in range(n_players)]
+
+		_keys_cache[size, n_players] = (cell_keys, side_keys)
+
+	return _keys_cache[size, n_players]
+
+
+def get_symmetries(size):
+	"""
+	Returns 8 symmetries (rotations and reflections) of the field.
+	:return list of 8 lists, where symmetry[cell] is the cell where the cell goes.
+	"""
+	if size not in _symmetries_cache:
+		last = size - 1
+		transforms = (
+			lambda row, column: (row, column),
+			lambda row, column: (column, last - row),
+			lambda row, column: (last - row, last - column),
+			lambda row, column: (last - column, row),
+			lambda row, column: (row, last - column),
+			lambda row, column: (last - row, column),
+			lambda row, column: (column, row),
+			lambda row, column: (last - column, last - row),
+		)
+
+		symmetries = list()
+		for transform in transforms:
+			symmetry = list()
+			for cell in range(size * size):
+				row, column = transform(*divmod(cell, size))
+				symmetry.append(row * size + column)
+			symmetries.append(symmetry)
+
+		_symmetries_cache[size] = symmetries
+
+	return _symmetries_cache[size]
+
+
+def get_canonical_key(size, n_players, cells, player_index):
+	"""
+	Returns the least of hashes of 8 symmetric positions and the symmetry which gives it.
+	:param size: size of game field.
+	:param n_players: number of players.
+	:param cells: list of pairs (cell, index) of filled cells and indices of their players.
+	:param player_index: index of the player to move.
+	:return tuple (hash, index of symmetry in get_symmetries())
+	"""
+	cell_keys, side_keys = get_zobrist_keys(size, n_players)
+	hashes = list()
+
+	for symmetry in get_symmetries(size):
+		hash_value = side_keys[player_index]
+		for cell, index in cells:
+			hash_value ^= cell_keys[index][symmetry[cell]]
+		hashes.append(hash_value)
+
+	hash_value = min(hashes)
+	return hash_value, hashes.index(hash_value)
+
+
+def get_canonical_hash(size, n_players, cells, player_index):
+	"""
+	Returns the least of hashes of 8 symmetric positions.
+	:param size: size of game field.
+	:param n_players: number of players.
+	:param cells: list of pairs (cell, index) of filled cells and indices of their players.
+	:param player_index: index of the player to move.
+	"""
+	return get_canonical_key(size, n_players, cells, player_index)[0]